@@ -8,8 +8,9 @@ from typing import Dict, Any, List
 import time
 
 # Import modules
+# src.graph (LangGraph, the agents SDK, OpenAI) is imported where it is used so
+# that Streamlit reruns which only redraw the page do not pay for it.
 from src.models import State
-from src.graph import create_workflow_graph, visualize_graph
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -49,6 +50,8 @@ with st.sidebar:
     
     #Generate workflow graph
     if st.button("Show Workflow Graph"):
+        from src.graph import visualize_graph
+
         graph_path = visualize_graph()
         if os.path.exists(graph_path):
             st.session_state.graph_image = graph_path
@@ -89,7 +92,14 @@ with col1:
             st.session_state.current_step = "Document Processing"
 
             # Continue with the workflow execution
-            workflow_graph = create_workflow_graph(temp_file_path,file_name)
+            from src.graph import create_workflow_graph
+            from src.checkpoint import make_run_id
+
+            # Re-processing the same upload resumes a failed or interrupted run
+            run_id = make_run_id(uploaded_file.getvalue(), email_from_alias)
+            logging.info(f"Workflow run ID: {run_id}")
+
+            workflow_graph = create_workflow_graph(temp_file_path,file_name,run_id=run_id)
             logging.info("Workflow graph created successfully")
             
             # Create initial state
@@ -140,7 +150,19 @@ with col1:
                         await asyncio.sleep(3)
                 
                 # Actually run the workflow
-                final_state = await graph_app.ainvoke(initial_state)
+                from src.transport import close_transport, transport_stats
+                from src.routing import routing_stats
+                from src.metrics import flush_events, write_prometheus
+
+                try:
+                    final_state = await graph_app.ainvoke(initial_state)
+                finally:
+                    # The pool is bound to this event loop, which asyncio.run closes afterwards
+                    await close_transport()
+                    logging.info(f"HTTP transport stats: {transport_stats()}")
+                    logging.info(f"Model routing stats: {routing_stats()}")
+                    flush_events()
+                    write_prometheus()
                 
                 # Complete the progress bar
                 progress_bar.progress(100)
@@ -0,0 +1,128 @@
+"""
+Summarise the metrics JSONL written by src/metrics.py.
+
+Reports p50/p95 wall and CPU time per node, latency and tokens per model, and
+per-document totals (tokens, images, payload), optionally for recent runs only.
+
+Usage:
+    python benchmarks/metrics_report.py
+    python benchmarks/metrics_report.py logs/metrics.jsonl --since-hours 24 --json
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from collections import defaultdict
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT_DIR)
+
+from config import METRICS_JSONL_PATH
+from src.utils import percentile
+
+
+def load_events(path: str, since: float = 0.0) -> list:
+    events = []
+    with open(path, "r") as file:
+        for line in file:
+            try:
+                event = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if event.get("ts", 0) >= since:
+                events.append(event)
+    return events
+
+
+def summarize(events: list) -> dict:
+    def distribution(values, scale=1.0):
+        return {"p50": percentile(values, 50) * scale, "p95": percentile(values, 95) * scale}
+
+    node_events = defaultdict(list)
+    # Nodes replayed from a checkpoint on resume did no work, so they are only counted
+    cached_nodes = defaultdict(int)
+    model_events = defaultdict(list)
+    runs = defaultdict(lambda: {"input_tokens": 0, "output_tokens": 0, "images": 0, "payload_bytes": 0})
+    for event in events:
+        run = runs[event["run_id"]]
+        if event["type"] == "node" and event.get("cached"):
+            cached_nodes[event["node"]] += 1
+        elif event["type"] == "node":
+            node_events[event["node"]].append(event)
+            run["images"] += event["images"]
+            run["payload_bytes"] += event["payload_bytes"]
+        elif event["type"] == "model_call":
+            model_events[event["model"]].append(event)
+            run["input_tokens"] += event["input_tokens"]
+            run["output_tokens"] += event["output_tokens"]
+
+    return {
+        "events": len(events),
+        "runs": len(runs),
+        "nodes": {
+            node: {
+                "runs": len(items),
+                "cached": cached_nodes[node],
+                "errors": sum(item["error"] for item in items),
+                "wall_ms": distribution([item["wall_s"] for item in items], 1000),
+                "cpu_ms": distribution([item["cpu_s"] for item in items], 1000),
+            }
+            for node, items in node_events.items()
+        },
+        "models": {
+            model: {
+                "calls": len(items),
+                "errors": sum(item["error"] for item in items),
+                "latency_ms": distribution([item["wall_s"] for item in items], 1000),
+                "input_tokens": sum(item["input_tokens"] for item in items),
+                "output_tokens": sum(item["output_tokens"] for item in items),
+            }
+            for model, items in model_events.items()
+        },
+        "per_document": {
+            key: distribution([run[key] for run in runs.values()])
+            for key in ("input_tokens", "output_tokens", "images", "payload_bytes")
+        },
+    }
+
+
+def print_report(summary: dict):
+    print(f"{summary['events']} events from {summary['runs']} runs\n")
+    print(f"{'node':<24}{'runs':>8}{'cached':>8}{'errors':>8}{'wall p50':>12}{'wall p95':>12}{'cpu p50':>12}{'cpu p95':>12}")
+    for node, stats in sorted(summary["nodes"].items(), key=lambda item: -item[1]["wall_ms"]["p50"]):
+        print(f"{node:<24}{stats['runs']:>8}{stats['cached']:>8}{stats['errors']:>8}"
+              f"{stats['wall_ms']['p50']:>10.0f}ms{stats['wall_ms']['p95']:>10.0f}ms"
+              f"{stats['cpu_ms']['p50']:>10.0f}ms{stats['cpu_ms']['p95']:>10.0f}ms")
+
+    print(f"\n{'model':<24}{'calls':>8}{'errors':>8}{'p50':>12}{'p95':>12}{'in tokens':>12}{'out tokens':>12}")
+    for model, stats in sorted(summary["models"].items()):
+        print(f"{model:<24}{stats['calls']:>8}{stats['errors']:>8}"
+              f"{stats['latency_ms']['p50']:>10.0f}ms{stats['latency_ms']['p95']:>10.0f}ms"
+              f"{stats['input_tokens']:>12}{stats['output_tokens']:>12}")
+
+    print(f"\n{'per document':<24}{'p50':>12}{'p95':>12}")
+    for key, stats in summary["per_document"].items():
+        print(f"{key:<24}{stats['p50']:>12.0f}{stats['p95']:>12.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarise workflow metrics.")
+    parser.add_argument("path", nargs="?", default=METRICS_JSONL_PATH, help="Metrics JSONL file")
+    parser.add_argument("--since-hours", type=float, help="Only include events from the last N hours")
+    parser.add_argument("--json", action="store_true", help="Print the summary as JSON")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.path):
+        sys.exit(f"No metrics file at {args.path}")
+
+    since = time.time() - args.since_hours * 3600 if args.since_hours else 0.0
+    summary = summarize(load_events(args.path, since))
+    if args.json:
+        print(json.dumps(summary, indent=2))
+    else:
+        print_report(summary)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,262 @@
+"""
+Replay document jobs from a JSONL file through the workflow and report latency.
+
+Each line is a job record:
+    {"document_path": "DummyDocs/AI.docx", "email_alias": "AI Agent", "options": {"file_name": "AI.docx"}}
+
+Jobs are driven either closed-loop (a fixed number of concurrent workers) or
+open-loop (Poisson arrivals at --rate jobs/s, at most --concurrency in flight).
+Model and SMTP calls go to the in-process stand-ins in src/stubs.py unless
+--live is given.
+
+Usage:
+    python benchmarks/replay.py                  # benchmarks/jobs.sample.jsonl
+    python benchmarks/replay.py jobs.jsonl --concurrency 8 --total 200
+    python benchmarks/replay.py jobs.jsonl --rate 2 --concurrency 16 --total 200 --json
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import logging
+import os
+import random
+import sys
+import time
+import uuid
+from collections import defaultdict
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT_DIR)
+
+from langgraph.graph import START
+from src.graph import WORKFLOW_EDGES, run_workflow
+from src.routing import routing_stats
+from src.stubs import stub_backends
+from src.transport import close_transport
+from src.utils import percentile
+
+# Predecessors of each node; a node is ready once all of them have finished
+PREDECESSORS = defaultdict(list)
+for _source, _target in WORKFLOW_EDGES:
+    PREDECESSORS[_target].append(_source)
+
+
+def load_jobs(path: str) -> list:
+    """Read job records, skipping lines that are not valid document jobs."""
+    jobs = []
+    skipped = 0
+    with open(path, "r") as file:
+        for line in file:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                skipped += 1
+                continue
+            document_path = record.get("document_path") if isinstance(record, dict) else None
+            if not document_path:
+                skipped += 1
+                continue
+            if not os.path.isabs(document_path):
+                document_path = os.path.join(os.path.dirname(os.path.abspath(path)), document_path)
+            options = record.get("options") or {}
+            jobs.append({
+                "document_path": document_path,
+                "file_name": options.get("file_name", os.path.basename(document_path)),
+                "email_alias": record.get("email_alias", ""),
+                "checkpoint": bool(options.get("checkpoint", False)),
+            })
+    if skipped:
+        logging.warning(f"Skipped {skipped} lines in {path} that are not document jobs")
+    return jobs
+
+
+async def run_job(job: dict, arrival: float, semaphore: asyncio.Semaphore) -> dict:
+    """Run one job once a slot is free and record its timings."""
+    node_times = defaultdict(dict)
+    failed_nodes = []
+
+    def observer(name, event, payload):
+        node_times[name][event] = time.perf_counter()
+        # Nodes return the State itself when they fail
+        if event == "error" or (event == "end" and not isinstance(payload, dict)):
+            failed_nodes.append(name)
+
+    async with semaphore:
+        started = time.perf_counter()
+        error = None
+        try:
+            final_state = await run_workflow(
+                job["document_path"],
+                job["file_name"],
+                job["email_alias"],
+                run_id=f"replay-{uuid.uuid4().hex}" if job["checkpoint"] else None,
+                observer=observer,
+            )
+            if final_state.get("failed_recipients"):
+                failed_nodes.append("email_sender")
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+        finished = time.perf_counter()
+
+    node_queue = {}
+    node_service = {}
+    for name, times in node_times.items():
+        if "start" not in times:
+            continue
+        ready = max((started if pred == START else node_times[pred].get("end", started))
+                    for pred in PREDECESSORS[name])
+        node_queue[name] = times["start"] - ready
+        end = times.get("end", times.get("error"))
+        if end is not None:
+            node_service[name] = end - times["start"]
+
+    return {
+        "document": job["file_name"],
+        "admission_wait": started - arrival,
+        "service_time": finished - started,
+        "latency": finished - arrival,
+        "ok": error is None and not failed_nodes,
+        "error": error or (f"failed nodes: {', '.join(failed_nodes)}" if failed_nodes else None),
+        "node_queue": node_queue,
+        "node_service": node_service,
+    }
+
+
+async def drive(jobs: list, total: int, concurrency: int, rate: float = None, seed: int = None) -> tuple:
+    """Submit `total` jobs (cycling through the records) and return (results, elapsed seconds)."""
+    semaphore = asyncio.Semaphore(concurrency)
+    rng = random.Random(seed)
+    start = time.perf_counter()
+    tasks = []
+
+    if rate:
+        # Open loop: arrivals follow a Poisson process regardless of completions
+        next_arrival = start
+        for index in range(total):
+            next_arrival += rng.expovariate(rate)
+            await asyncio.sleep(max(0.0, next_arrival - time.perf_counter()))
+            tasks.append(asyncio.create_task(run_job(jobs[index % len(jobs)], time.perf_counter(), semaphore)))
+        results = await asyncio.gather(*tasks)
+    else:
+        # Closed loop: each worker submits its next job as soon as the previous one finishes
+        queue = list(range(total))
+        results = []
+
+        async def worker():
+            while queue:
+                index = queue.pop(0)
+                results.append(await run_job(jobs[index % len(jobs)], time.perf_counter(), semaphore))
+
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+
+    await close_transport()
+    return results, time.perf_counter() - start
+
+
+def summarize(results: list, elapsed: float) -> dict:
+    """Aggregate per-job results into latency, throughput, error and per-node statistics."""
+    def distribution(values):
+        return {
+            "p50_ms": percentile(values, 50) * 1000,
+            "p95_ms": percentile(values, 95) * 1000,
+            "p99_ms": percentile(values, 99) * 1000,
+        }
+
+    errors = [result for result in results if not result["ok"]]
+    nodes = {}
+    for name in PREDECESSORS:
+        queued = [result["node_queue"][name] for result in results if name in result["node_queue"]]
+        service = [result["node_service"][name] for result in results if name in result["node_service"]]
+        if queued or service:
+            nodes[name] = {"queue": distribution(queued), "service": distribution(service), "runs": len(service)}
+
+    error_counts = defaultdict(int)
+    for result in errors:
+        error_counts[result["error"]] += 1
+
+    return {
+        "jobs": len(results),
+        "elapsed_s": elapsed,
+        "throughput_jobs_per_s": len(results) / elapsed if elapsed else 0.0,
+        "error_rate": len(errors) / len(results) if results else 0.0,
+        "errors": dict(error_counts),
+        "latency": distribution([result["latency"] for result in results]),
+        "admission_wait": distribution([result["admission_wait"] for result in results]),
+        "service_time": distribution([result["service_time"] for result in results]),
+        "nodes": nodes,
+        "routing": routing_stats(),
+    }
+
+
+def print_report(summary: dict):
+    print(f"Jobs: {summary['jobs']}  elapsed: {summary['elapsed_s']:.1f}s  "
+          f"throughput: {summary['throughput_jobs_per_s']:.2f} jobs/s  error rate: {summary['error_rate']:.1%}")
+    print(f"\n{'':<24}{'p50 (ms)':>12}{'p95 (ms)':>12}{'p99 (ms)':>12}")
+    for label, key in [("end-to-end", "latency"), ("admission wait", "admission_wait"), ("service time", "service_time")]:
+        stats = summary[key]
+        print(f"{label:<24}{stats['p50_ms']:>12.0f}{stats['p95_ms']:>12.0f}{stats['p99_ms']:>12.0f}")
+
+    print(f"\n{'node':<24}{'queue p50':>12}{'queue p95':>12}{'run p50':>12}{'run p95':>12}")
+    for name, stats in summary["nodes"].items():
+        print(f"{name:<24}{stats['queue']['p50_ms']:>12.0f}{stats['queue']['p95_ms']:>12.0f}"
+              f"{stats['service']['p50_ms']:>12.0f}{stats['service']['p95_ms']:>12.0f}")
+
+    for stage, stats in summary["routing"].items():
+        tiers = ", ".join(f"{tier} p50 {tier_stats['latency_p50_ms']:.0f}ms" for tier, tier_stats in stats["tiers"].items())
+        print(f"\n{stage} routing: {stats['escalation_rate']:.1%} escalated of {stats['calls']} calls ({tiers})")
+
+    for error, count in summary["errors"].items():
+        print(f"ERROR x{count}: {error}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay document jobs from JSONL through the workflow.")
+    parser.add_argument("jobs", nargs="?", default=os.path.join(os.path.dirname(__file__), "jobs.sample.jsonl"),
+                        help="JSONL file of job records (default: benchmarks/jobs.sample.jsonl)")
+    parser.add_argument("--total", type=int, help="Number of jobs to run (default: one per record)")
+    parser.add_argument("--concurrency", type=int, default=4, help="Maximum jobs in flight")
+    parser.add_argument("--rate", type=float, help="Open-loop arrival rate in jobs/s (default: closed loop)")
+    parser.add_argument("--model-latency", type=float, default=0.5, help="Mean stub text model latency (s)")
+    parser.add_argument("--vision-latency", type=float, default=1.0, help="Mean stub vision model latency (s)")
+    parser.add_argument("--smtp-latency", type=float, default=0.2, help="Mean stub SMTP latency (s)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Probability a stub model call fails")
+    parser.add_argument("--smtp-error-rate", type=float, default=0.0, help="Probability a stub email send fails")
+    parser.add_argument("--confidence", type=float, default=0.9, help="Confidence reported by stub fast-tier models")
+    parser.add_argument("--seed", type=int, help="Random seed for arrivals and stub latencies")
+    parser.add_argument("--revisions", action="store_true",
+                        help="Reuse revision results across stub jobs (in a scratch store)")
+    parser.add_argument("--live", action="store_true", help="Use the real OpenAI and SMTP backends")
+    parser.add_argument("--json", action="store_true", help="Print the summary as JSON")
+    args = parser.parse_args()
+
+    jobs = load_jobs(args.jobs)
+    if not jobs:
+        sys.exit(f"No document jobs found in {args.jobs}")
+
+    backends = contextlib.nullcontext() if args.live else stub_backends(
+        model_latency=args.model_latency,
+        vision_latency=args.vision_latency,
+        smtp_latency=args.smtp_latency,
+        error_rate=args.error_rate,
+        smtp_error_rate=args.smtp_error_rate,
+        confidence=args.confidence,
+        seed=args.seed,
+        revisions=args.revisions,
+    )
+    # The pipeline prints progress to stdout; keep stdout for the report so --json output parses
+    with backends, contextlib.redirect_stdout(sys.stderr):
+        results, elapsed = asyncio.run(drive(jobs, args.total or len(jobs), args.concurrency, args.rate, args.seed))
+
+    summary = summarize(results, elapsed)
+    if args.json:
+        print(json.dumps(summary, indent=2))
+    else:
+        print_report(summary)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Measure cold-start import time and memory for the app and the pipeline modules.
+
+Each target is loaded in a fresh interpreter so nothing is shared between
+measurements. The run fails (exit code 1) when any target goes over the budget
+configured in config.py, so it can be used as a gate for worker and CLI start-up.
+
+Usage:
+    python benchmarks/startup.py
+    python benchmarks/startup.py --json
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT_DIR)
+
+from config import STARTUP_IMPORT_BUDGET_SECONDS, STARTUP_RSS_BUDGET_MB
+
+# Modules are imported; paths ending in .py are executed as scripts
+TARGETS = [
+    "src.models",
+    "src.utils",
+    "src.document_processor",
+    "src.tools",
+    "src.agents",
+    "src.nodes",
+    "src.graph",
+    "app.py",
+]
+
+_PROBE = """
+import json, resource, runpy, sys, time
+target = sys.argv[1]
+rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+start = time.perf_counter()
+if target.endswith(".py"):
+    runpy.run_path(target, run_name="__startup_probe__")
+else:
+    __import__(target)
+elapsed = time.perf_counter() - start
+rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+# ru_maxrss is reported in bytes on macOS and in kilobytes on Linux
+scale = 1024 * 1024 if sys.platform == "darwin" else 1024
+print(json.dumps({"seconds": elapsed, "rss_mb": rss / scale, "rss_delta_mb": (rss - rss_before) / scale}))
+"""
+
+
+def measure(target: str) -> dict:
+    """Import a single target in a fresh interpreter and return its timings."""
+    proc = subprocess.run(
+        [sys.executable, "-c", _PROBE, target],
+        cwd=ROOT_DIR,
+        capture_output=True,
+        text=True,
+    )
+    if proc.returncode != 0:
+        return {"target": target, "error": proc.stderr.strip().splitlines()[-1:] or ["unknown error"]}
+
+    # Streamlit and logging may print to stdout as well; the probe result is the last line
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    result["target"] = target
+    return result
+
+
+def check_budget(result: dict) -> list:
+    """Return the list of budget violations for a measurement."""
+    if "error" in result:
+        return [f"{result['target']}: failed to import ({result['error'][0]})"]
+
+    violations = []
+    if result["seconds"] > STARTUP_IMPORT_BUDGET_SECONDS:
+        violations.append(
+            f"{result['target']}: import took {result['seconds']:.2f}s "
+            f"(budget {STARTUP_IMPORT_BUDGET_SECONDS:.2f}s)"
+        )
+    if result["rss_mb"] > STARTUP_RSS_BUDGET_MB:
+        violations.append(
+            f"{result['target']}: RSS {result['rss_mb']:.1f}MB "
+            f"(budget {STARTUP_RSS_BUDGET_MB:.1f}MB)"
+        )
+    return violations
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure cold-start import time and RSS.")
+    parser.add_argument("targets", nargs="*", default=TARGETS, help="Modules or scripts to measure")
+    parser.add_argument("--json", action="store_true", help="Print raw results as JSON")
+    args = parser.parse_args()
+
+    results = [measure(target) for target in args.targets]
+    violations = [v for result in results for v in check_budget(result)]
+
+    if args.json:
+        print(json.dumps({"results": results, "violations": violations}, indent=2))
+    else:
+        print(f"{'target':<28}{'import (s)':>12}{'RSS (MB)':>12}")
+        for result in results:
+            if "error" in result:
+                print(f"{result['target']:<28}{'error':>12}{'-':>12}")
+            else:
+                print(f"{result['target']:<28}{result['seconds']:>12.3f}{result['rss_mb']:>12.1f}")
+        print(f"\nBudget: {STARTUP_IMPORT_BUDGET_SECONDS:.2f}s / {STARTUP_RSS_BUDGET_MB:.0f}MB per target")
+        for violation in violations:
+            print(f"OVER BUDGET - {violation}")
+
+    sys.exit(1 if violations else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -7,6 +7,16 @@ load_dotenv()
 # OpenAI Configuration
 OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL")
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+OPENAI_MAX_RETRIES = int(os.getenv("OPENAI_MAX_RETRIES", "2"))
+
+# Shared HTTP transport for all OpenAI traffic (see src/transport.py)
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "100"))
+HTTP_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("HTTP_MAX_KEEPALIVE_CONNECTIONS", "20"))
+HTTP_KEEPALIVE_EXPIRY = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "60"))
+HTTP_TIMEOUT = float(os.getenv("HTTP_TIMEOUT", "600"))
+HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "10"))
+# HTTP/2 is used only when the optional `h2` package is installed
+HTTP_ENABLE_HTTP2 = os.getenv("HTTP_ENABLE_HTTP2", "true").lower() == "true"
 
 # Email Configuration
 EMAIL_SENDER = os.getenv("EMAIL_SENDER")
@@ -20,4 +30,54 @@ DOC_PROCESSING_MODEL = "gpt-3.5-turbo"
 CLIENT_IDENTIFICATION_MODEL = "o1"
 TEXT_TO_IMAGE_IDENTIFICATION_MODEL="gpt-4-turbo"
 
-VALID_CLIENTS = ["Neste", "IBM", "IKEA", "Microsoft", "Unilever","Amazon"]
\ No newline at end of file
+# Tiered model routing: a fast model answers first and the models above are only
+# used when its confidence is low, it conflicts with the registry, or the input is large
+TIERED_ROUTING_ENABLED = os.getenv("TIERED_ROUTING_ENABLED", "false").lower() == "true"
+TEXT_FAST_MODEL = os.getenv("TEXT_FAST_MODEL", "gpt-4o-mini")
+TEXT_ESCALATION_CONFIDENCE = float(os.getenv("TEXT_ESCALATION_CONFIDENCE", "0.7"))
+TEXT_COMPLEXITY_TOKENS = int(os.getenv("TEXT_COMPLEXITY_TOKENS", "8000"))
+IMAGE_FAST_MODEL = os.getenv("IMAGE_FAST_MODEL", "gpt-4o-mini")
+IMAGE_ESCALATION_CONFIDENCE = float(os.getenv("IMAGE_ESCALATION_CONFIDENCE", "0.7"))
+IMAGE_COMPLEXITY_BYTES = int(os.getenv("IMAGE_COMPLEXITY_BYTES", str(2 * 1024 * 1024)))
+
+VALID_CLIENTS = ["Neste", "IBM", "IKEA", "Microsoft", "Unilever","Amazon"]
+
+# Candidate-span prefilter applied before client identification
+PREFILTER_ENABLED = os.getenv("PREFILTER_ENABLED", "true").lower() == "true"
+# Sentences kept on each side of a likely client mention (higher = better recall, more tokens)
+PREFILTER_RECALL_MARGIN = int(os.getenv("PREFILTER_RECALL_MARGIN", "1"))
+# Documents shorter than this are sent unfiltered
+PREFILTER_MIN_TOKENS = int(os.getenv("PREFILTER_MIN_TOKENS", "1500"))
+# Send the full text when the filter would keep more than this share of sentences
+PREFILTER_MAX_KEEP_RATIO = float(os.getenv("PREFILTER_MAX_KEEP_RATIO", "0.8"))
+
+# Per-node checkpoints so failed runs resume from the last completed node
+CHECKPOINT_ENABLED = os.getenv("CHECKPOINT_ENABLED", "true").lower() == "true"
+CHECKPOINT_DB_PATH = os.getenv("CHECKPOINT_DB_PATH", "checkpoints/workflow.sqlite")
+CHECKPOINT_BLOB_DIR = os.getenv("CHECKPOINT_BLOB_DIR", "checkpoints/blobs")
+
+# Incremental re-processing of revised documents
+REVISION_ENABLED = os.getenv("REVISION_ENABLED", "true").lower() == "true"
+REVISION_DB_PATH = os.getenv("REVISION_DB_PATH", "checkpoints/revisions.sqlite")
+# Minimum share of paragraphs (Jaccard) an upload must have in common with a stored document
+REVISION_MATCH_THRESHOLD = float(os.getenv("REVISION_MATCH_THRESHOLD", "0.5"))
+# Most recent documents compared with an upload in addition to those with the same file name lineage
+REVISION_MATCH_CANDIDATES = int(os.getenv("REVISION_MATCH_CANDIDATES", "50"))
+
+# Per-node and per-model-call metrics (see src/metrics.py)
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+METRICS_JSONL_PATH = os.getenv("METRICS_JSONL_PATH", "logs/metrics.jsonl")
+METRICS_PROMETHEUS_PATH = os.getenv("METRICS_PROMETHEUS_PATH", "logs/metrics.prom")
+
+# HTTP job service (service.py)
+SERVICE_HOST = os.getenv("SERVICE_HOST", "127.0.0.1")
+SERVICE_PORT = int(os.getenv("SERVICE_PORT", "8080"))
+SERVICE_WORKERS = int(os.getenv("SERVICE_WORKERS", "4"))
+# Uploads are rejected with HTTP 429 once this many jobs are waiting
+SERVICE_QUEUE_SIZE = int(os.getenv("SERVICE_QUEUE_SIZE", "32"))
+SERVICE_JOB_RETENTION = int(os.getenv("SERVICE_JOB_RETENTION", "1000"))
+SERVICE_MAX_UPLOAD_MB = float(os.getenv("SERVICE_MAX_UPLOAD_MB", "50"))
+
+# Startup budget enforced by benchmarks/startup.py (cold import, fresh interpreter)
+STARTUP_IMPORT_BUDGET_SECONDS = float(os.getenv("STARTUP_IMPORT_BUDGET_SECONDS", "4.0"))
+STARTUP_RSS_BUDGET_MB = float(os.getenv("STARTUP_RSS_BUDGET_MB", "350"))
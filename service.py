@@ -0,0 +1,158 @@
+"""
+HTTP job service for the document workflow.
+
+    POST /jobs               multipart upload: "file" (PDF/DOCX), optional "email_from_alias"
+                             -> 202 {"job_id": ...}, 200 with the existing job when the same
+                             upload and alias are already queued or running, or 429 when the queue is full
+    GET  /jobs/{job_id}      job status
+    GET  /jobs/{job_id}/result  final result once the job has succeeded
+    GET  /health             worker, queue, HTTP transport and model routing statistics
+    GET  /metrics            per-node and per-model metrics in Prometheus text format
+
+Run with:
+    python service.py                 # real OpenAI and SMTP backends
+    python service.py --stub          # in-process model and mail stand-ins
+"""
+import argparse
+import contextlib
+import logging
+
+from aiohttp import web
+from dotenv import load_dotenv
+
+from config import (
+    SERVICE_HOST,
+    SERVICE_PORT,
+    SERVICE_WORKERS,
+    SERVICE_QUEUE_SIZE,
+    SERVICE_JOB_RETENTION,
+    SERVICE_MAX_UPLOAD_MB,
+)
+from src.jobs import JobManager, QueueFullError, SUCCEEDED, FAILED
+from src.metrics import render_prometheus
+from src.routing import routing_stats
+from src.transport import close_transport, transport_stats
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+# Load environment variables
+load_dotenv()
+
+SUPPORTED_EXTENSIONS = (".pdf", ".docx")
+_STATUS_FIELDS = ("job_id", "status", "file_name", "submitted_at", "started_at", "finished_at", "error")
+
+
+def _job_status(job: dict) -> dict:
+    return {field: job[field] for field in _STATUS_FIELDS}
+
+
+async def submit_job(request: web.Request) -> web.Response:
+    manager = request.app["jobs"]
+    file_name, file_bytes, email_from_alias = None, None, ""
+
+    if not request.content_type.startswith("multipart/"):
+        return web.json_response({"error": "Expected a multipart/form-data upload"}, status=400)
+    try:
+        reader = await request.multipart()
+        async for part in reader:
+            if part.name == "file":
+                file_name = part.filename or "document"
+                file_bytes = await part.read()
+            elif part.name == "email_from_alias":
+                email_from_alias = await part.text()
+    except ValueError as e:
+        # Malformed multipart body (e.g. missing boundary)
+        return web.json_response({"error": f"Invalid multipart upload: {str(e)}"}, status=400)
+
+    if not file_bytes:
+        return web.json_response({"error": "Missing 'file' upload"}, status=400)
+    if not file_name.lower().endswith(SUPPORTED_EXTENSIONS):
+        return web.json_response({"error": "Unsupported file type. Only .pdf and .docx are supported."}, status=400)
+
+    try:
+        job, created = manager.submit(file_name, file_bytes, email_from_alias)
+    except QueueFullError as e:
+        return web.json_response({"error": str(e)}, status=429, headers={"Retry-After": "5"})
+
+    # A duplicate of an unfinished job gets that job back rather than a second run
+    return web.json_response(_job_status(job), status=202 if created else 200,
+                             headers={"Location": f"/jobs/{job['job_id']}"})
+
+
+async def get_job(request: web.Request) -> web.Response:
+    job = request.app["jobs"].get(request.match_info["job_id"])
+    if job is None:
+        return web.json_response({"error": "Job not found"}, status=404)
+    return web.json_response(_job_status(job))
+
+
+async def get_job_result(request: web.Request) -> web.Response:
+    job = request.app["jobs"].get(request.match_info["job_id"])
+    if job is None:
+        return web.json_response({"error": "Job not found"}, status=404)
+    if job["status"] == FAILED:
+        return web.json_response(_job_status(job), status=500)
+    if job["status"] != SUCCEEDED:
+        # Not finished yet: the client should poll the status endpoint
+        return web.json_response(_job_status(job), status=202)
+    return web.json_response({**_job_status(job), "result": job["result"]})
+
+
+async def health(request: web.Request) -> web.Response:
+    return web.json_response({
+        "jobs": request.app["jobs"].stats(),
+        "transport": transport_stats(),
+        "routing": routing_stats(),
+    })
+
+
+async def metrics(request: web.Request) -> web.Response:
+    return web.Response(body=render_prometheus().encode("utf-8"),
+                        headers={"Content-Type": "text/plain; version=0.0.4; charset=utf-8"})
+
+
+def create_app(workers: int = SERVICE_WORKERS, queue_size: int = SERVICE_QUEUE_SIZE,
+               retention: int = SERVICE_JOB_RETENTION) -> web.Application:
+    """Create the aiohttp application with its job manager."""
+    app = web.Application(client_max_size=int(SERVICE_MAX_UPLOAD_MB * 1024 * 1024))
+    app["jobs"] = JobManager(workers=workers, queue_size=queue_size, retention=retention)
+
+    async def on_startup(app):
+        await app["jobs"].start()
+
+    async def on_cleanup(app):
+        await app["jobs"].stop()
+        await close_transport()
+
+    app.on_startup.append(on_startup)
+    app.on_cleanup.append(on_cleanup)
+    app.router.add_post("/jobs", submit_job)
+    app.router.add_get("/jobs/{job_id}", get_job)
+    app.router.add_get("/jobs/{job_id}/result", get_job_result)
+    app.router.add_get("/health", health)
+    app.router.add_get("/metrics", metrics)
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the document workflow HTTP job service.")
+    parser.add_argument("--host", default=SERVICE_HOST)
+    parser.add_argument("--port", type=int, default=SERVICE_PORT)
+    parser.add_argument("--workers", type=int, default=SERVICE_WORKERS, help="Jobs processed concurrently")
+    parser.add_argument("--queue-size", type=int, default=SERVICE_QUEUE_SIZE, help="Jobs waiting before uploads are rejected")
+    parser.add_argument("--stub", action="store_true", help="Use in-process model and mail stand-ins")
+    args = parser.parse_args()
+
+    backends = contextlib.nullcontext()
+    if args.stub:
+        from src.stubs import stub_backends
+
+        backends = stub_backends()
+
+    with backends:
+        web.run_app(create_app(args.workers, args.queue_size), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,19 +1,20 @@
-import os
-from openai import AsyncOpenAI
 from agents import (
     Agent,
+    OpenAIProvider,
+    RunConfig,
     set_default_openai_api,
-    set_default_openai_client,
     set_tracing_disabled,
 )
 from config import (
     DOC_PROCESSING_MODEL,
-    CLIENT_IDENTIFICATION_MODEL
+    CLIENT_IDENTIFICATION_MODEL,
+    TEXT_FAST_MODEL
 )
 import logging
 from dotenv import load_dotenv
-from src.models import ClientIdentificationResult
+from src.models import ClientIdentificationResult, TieredClientIdentificationResult
 from src.tools import extract_document_content
+from src import transport
 
 # Load environment variables
 load_dotenv()
@@ -21,13 +22,19 @@ load_dotenv()
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
-# Configure OpenAI client
-client = AsyncOpenAI(
-    base_url=os.getenv("OPENAI_BASE_URL"),
-    api_key=os.getenv("OPENAI_API_KEY"),
-)
+def get_openai_client():
+    """Return the shared AsyncOpenAI client for the running event loop."""
+    return transport.get_openai_client()
+
+def agent_run_config(client) -> RunConfig:
+    """
+    Run configuration that sends an agent run through `client`, so agents and direct
+    calls use the same connection pool. It is passed to each Runner.run rather than set
+    as the agents SDK default client, which is process-wide: Streamlit sessions run on
+    their own event loops and would swap it in the middle of each other's runs.
+    """
+    return RunConfig(model_provider=OpenAIProvider(openai_client=client))
 
-set_default_openai_client(client=client, use_for_tracing=False)
 set_default_openai_api("chat_completions")
 set_tracing_disabled(disabled=True)
 
@@ -47,6 +54,10 @@ Guidelines for Extraction:
  - Consider variations of client names (e.g., "ABC Corp." vs. "ABC Corporation").
 Format the extracted information clearly and concisely for downstream processing."""
 
+FAST_CLIENT_IDENTIFICATION_INSTRUCTION = CLIENT_IDENTIFICATION_INSTRUCTION + """
+Also report your confidence from 0 to 1 that the list is complete and correct. Use a low value when
+the document is ambiguous, mentions many organizations, or you are unsure whether a name is a client."""
+
 # Define agents
 doc_processing_agent = Agent(
     name="Document Processing Agent",
@@ -61,4 +72,12 @@ clients_identification_agent = Agent(
     instructions=CLIENT_IDENTIFICATION_INSTRUCTION,
     model=CLIENT_IDENTIFICATION_MODEL,
     output_type=ClientIdentificationResult,
-)
\ No newline at end of file
+)
+
+# Cheap first tier used by tiered routing (see src/routing.py)
+fast_clients_identification_agent = Agent(
+    name="Fast Client Identification Agent",
+    instructions=FAST_CLIENT_IDENTIFICATION_INSTRUCTION,
+    model=TEXT_FAST_MODEL,
+    output_type=TieredClientIdentificationResult,
+)
@@ -0,0 +1,145 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+from config import CHECKPOINT_DB_PATH, CHECKPOINT_BLOB_DIR
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+_BLOB_KEY = "__blob__"
+
+
+def make_run_id(document_bytes: bytes, email_from_alias: str = "") -> str:
+    """Derive a run ID from the document and its options, so re-submitting the same job resumes it."""
+    digest = hashlib.sha256(document_bytes)
+    digest.update(b"\0" + (email_from_alias or "").encode("utf-8"))
+    return digest.hexdigest()[:32]
+
+
+class CheckpointStore:
+    """
+    SQLite store of completed node updates, keyed by run ID and node name.
+
+    Large binary values (document bytes, extracted images) are written once to a
+    content-addressed blob directory and the checkpoint only keeps their digest.
+    """
+
+    def __init__(self, db_path: Optional[str] = None, blob_dir: Optional[str] = None):
+        # Looked up at call time so the stub backends can point them at a scratch store
+        self.db_path = db_path or CHECKPOINT_DB_PATH
+        self.blob_dir = blob_dir or CHECKPOINT_BLOB_DIR
+        os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+        os.makedirs(self.blob_dir, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS checkpoints ("
+                " run_id TEXT NOT NULL, node TEXT NOT NULL, payload TEXT NOT NULL,"
+                " created_at REAL NOT NULL, PRIMARY KEY (run_id, node))"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS blob_refs ("
+                " run_id TEXT NOT NULL, digest TEXT NOT NULL, PRIMARY KEY (run_id, digest))"
+            )
+
+    @contextmanager
+    def _connect(self):
+        # One short-lived connection per operation: nodes may run on different threads
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _blob_path(self, digest: str) -> str:
+        return os.path.join(self.blob_dir, digest[:2], digest)
+
+    def _write_blob(self, data: bytes, digests: set) -> Dict[str, str]:
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._blob_path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        digests.add(digest)
+        return {_BLOB_KEY: digest}
+
+    def _encode(self, value, digests: set):
+        if isinstance(value, (bytes, bytearray)):
+            return self._write_blob(bytes(value), digests)
+        if isinstance(value, (list, tuple)):
+            return [self._encode(item, digests) for item in value]
+        if isinstance(value, dict):
+            return {key: self._encode(item, digests) for key, item in value.items()}
+        return value
+
+    def _decode(self, value):
+        if isinstance(value, dict):
+            if set(value) == {_BLOB_KEY}:
+                with open(self._blob_path(value[_BLOB_KEY]), "rb") as f:
+                    return f.read()
+            return {key: self._decode(item) for key, item in value.items()}
+        if isinstance(value, list):
+            return [self._decode(item) for item in value]
+        return value
+
+    def save(self, run_id: str, node: str, update: dict):
+        """Persist the state update returned by a completed node."""
+        digests = set()
+        payload = json.dumps(self._encode(update, digests))
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO checkpoints (run_id, node, payload, created_at) VALUES (?, ?, ?, ?)",
+                (run_id, node, payload, time.time()),
+            )
+            conn.executemany(
+                "INSERT OR IGNORE INTO blob_refs (run_id, digest) VALUES (?, ?)",
+                [(run_id, digest) for digest in digests],
+            )
+
+    def load(self, run_id: str, node: str) -> Optional[dict]:
+        """Return the stored update for a node, or None if it has not completed in this run."""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT payload FROM checkpoints WHERE run_id = ? AND node = ?", (run_id, node)
+            ).fetchone()
+        if row is None:
+            return None
+        try:
+            return self._decode(json.loads(row[0]))
+        except OSError as e:
+            # A missing blob invalidates the checkpoint; the node simply runs again
+            logging.warning(f"Discarding checkpoint {run_id}/{node}: {str(e)}")
+            return None
+
+    def completed_nodes(self, run_id: str) -> List[str]:
+        with self._connect() as conn:
+            rows = conn.execute("SELECT node FROM checkpoints WHERE run_id = ?", (run_id,)).fetchall()
+        return [row[0] for row in rows]
+
+    def clear(self, run_id: str):
+        """Delete a run's checkpoints and any blobs no other run references."""
+        with self._connect() as conn:
+            digests = [row[0] for row in conn.execute(
+                "SELECT digest FROM blob_refs WHERE run_id = ?", (run_id,)
+            ).fetchall()]
+            conn.execute("DELETE FROM checkpoints WHERE run_id = ?", (run_id,))
+            conn.execute("DELETE FROM blob_refs WHERE run_id = ?", (run_id,))
+            orphaned = [digest for digest in digests if conn.execute(
+                "SELECT 1 FROM blob_refs WHERE digest = ? LIMIT 1", (digest,)
+            ).fetchone() is None]
+
+        for digest in orphaned:
+            try:
+                os.remove(self._blob_path(digest))
+            except FileNotFoundError:
+                pass
@@ -1,21 +1,28 @@
-from docx import Document
-import PyPDF2
 import logging
-import pdfplumber
 import io
 
+# Parsers are imported inside the functions that need them: each one is only
+# required for its own file type and they are slow to import.
+
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
 def process_docx(doc_path):
     """Process a DOCX file and extract its text content."""
     try:
+        from docx import Document
+
         logging.info(f"Attempting to process DOCX file: {doc_path}")
         doc = Document(doc_path)
         full_text = []
         for para in doc.paragraphs:
             logging.debug(f"Extracted paragraph: {para.text[:50]}...")  # Log the first 50 characters of each paragraph
             full_text.append(para.text)
+        # Table cells are not part of doc.paragraphs; keep each row on one line
+        for table in doc.tables:
+            for row in table.rows:
+                cells = [cell.text.strip() for cell in row.cells]
+                full_text.append(" | ".join(cells))
         logging.info(f"Successfully processed DOCX file: {doc_path}")
         return "\n".join(full_text)
     except Exception as e:
@@ -25,6 +32,8 @@ def process_docx(doc_path):
 def process_pdf(doc_path):
     """Process a PDF file and extract its text content."""
     try:
+        import PyPDF2
+
         with open(doc_path, "rb") as file:
             reader = PyPDF2.PdfReader(file)
             full_text = []
@@ -36,6 +45,8 @@ def process_pdf(doc_path):
         return f"Error reading PDF file: {str(e)}"
 
 def extract_images_from_pdf(file_bytes):
+    import pdfplumber
+
     images = []
     with pdfplumber.open(io.BytesIO(file_bytes)) as pdf:
         for page in pdf.pages:
@@ -46,6 +57,8 @@ def extract_images_from_pdf(file_bytes):
     return images
 
 def extract_images_from_docx(file_bytes):
+    from docx import Document
+
     images = []
     doc = Document(io.BytesIO(file_bytes))
     for rel in doc.part._rels:
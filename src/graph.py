@@ -1,12 +1,13 @@
 import os
-import logging
+import time
 import asyncio
+import uuid
+import inspect
+import logging
+from collections import defaultdict
+from typing import Callable, Optional
 from langgraph.graph import StateGraph, START, END
 from src.models import State
-import networkx as nx
-import matplotlib.pyplot as plt
-import base64
-from networkx.drawing.nx_pydot import graphviz_layout
 
 from src.nodes import (
     client_identifier,
@@ -17,43 +18,191 @@ from src.nodes import (
     document_processor,
     email_sender
 )
-from IPython.display import Image, display
-import re
-import ast
+from src.checkpoint import CheckpointStore
+from src import metrics
+from config import CHECKPOINT_ENABLED
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
-def create_workflow_graph(document_path: str, file_name: str):
-    """Create the workflow graph using LangGraph."""
+# Workflow topology: document processing fans out to text and image client
+# identification, which are joined again before verification and emailing.
+WORKFLOW_EDGES = [
+    (START, "document_processor"),
+    ("document_processor", "client_identifier"),
+    ("document_processor", "extract_images"),
+    ("extract_images", "extract_clients"),
+    ("client_identifier", "client_consolidator"),
+    ("extract_clients", "client_consolidator"),
+    ("client_consolidator", "client_verifier"),
+    ("client_verifier", "email_sender"),
+    ("email_sender", END),
+]
+
+def observed(name: str, node_func, observer: Callable):
+    """
+    Wrap a node so `observer(name, event, payload)` is called when it starts
+    ("start", None), returns ("end", update) or raises ("error", exception).
+    """
+    async def node(state: State):
+        observer(name, "start", None)
+        try:
+            update = node_func(state)
+            if inspect.isawaitable(update):
+                update = await update
+        except Exception as e:
+            observer(name, "error", e)
+            raise
+        observer(name, "end", update)
+        return update
+
+    return node
+
+def instrumented(name: str, node_func, run_id: str):
+    """
+    Wrap a node to record its wall time, CPU time, payload size, image count and
+    errors, and to tag the model calls it makes with the node name and run ID.
+    Nodes replayed from a checkpoint are recorded as cached.
+    """
+    async def node(state: State):
+        run_token = metrics.current_run_id.set(run_id)
+        node_token = metrics.current_node.set(name)
+        replayed_token = metrics.node_replayed.set(False)
+        started, cpu_started = time.perf_counter(), time.process_time()
+        update = None
+        try:
+            update = node_func(state)
+            if inspect.isawaitable(update):
+                update = await update
+            return update
+        finally:
+            # CPU time is process-wide, so it includes other documents running concurrently
+            metrics.record_node(
+                name,
+                run_id,
+                time.perf_counter() - started,
+                time.process_time() - cpu_started,
+                payload=metrics.payload_bytes(update),
+                images=len(update.get("images", [])) if isinstance(update, dict) else 0,
+                # Nodes return the State itself when they fail
+                error=not isinstance(update, dict),
+                cached=metrics.node_replayed.get(),
+            )
+            metrics.node_replayed.reset(replayed_token)
+            metrics.current_node.reset(node_token)
+            metrics.current_run_id.reset(run_token)
+
+    return node
+
+def checkpointed(name: str, node_func, store: CheckpointStore, run_id: str, final: bool = False):
+    """
+    Wrap a node so its state update is saved once it completes and replayed,
+    instead of re-running the node, when the same run is resumed.
+
+    An update listing `failed_recipients` is saved too, but only as progress: on
+    resume the node runs again on top of it, so email_sender retries just those sends.
+    """
+    # The store does SQLite and blob file I/O, so it runs in a thread to keep the event loop free
+    async def node(state: State):
+        update = await asyncio.to_thread(store.load, run_id, name)
+        if update is not None and not update.get("failed_recipients"):
+            logging.info(f"Run {run_id}: reusing checkpoint for {name}")
+            metrics.node_replayed.set(True)
+            return update
+        if update is not None:
+            logging.info(f"Run {run_id}: resuming {name}, retrying {len(update['failed_recipients'])} failed sends")
+            state = state.model_copy(update=update)
+
+        update = node_func(state)
+        if inspect.isawaitable(update):
+            update = await update
+
+        # Nodes return the State itself when they fail, so only dict updates count as completed.
+        # email_sender returns a dict even when sends fail and lists the failed recipients instead.
+        if isinstance(update, dict):
+            if final and not update.get("failed_recipients"):
+                # The run is done, nothing left to resume
+                await asyncio.to_thread(store.clear, run_id)
+            else:
+                await asyncio.to_thread(store.save, run_id, name, update)
+        return update
+
+    return node
+
+def create_workflow_graph(document_path: str, file_name: str, run_id: Optional[str] = None,
+                          checkpoint_store: Optional[CheckpointStore] = None,
+                          observer: Optional[Callable] = None):
+    """
+    Create the workflow graph using LangGraph.
+
+    When a run_id is given, each node's result is checkpointed so a failed or
+    interrupted run resumes from the last completed node. Every node is
+    instrumented (see `instrumented`) and an optional observer is notified when
+    each node starts and finishes (see `observed`).
+    """
     # Create a new graph
     workflow = StateGraph(State)
 
+    nodes = {
+        "document_processor": lambda state: document_processor(state, document_path, file_name),
+        "client_identifier": client_identifier,
+        "extract_images": extract_images,
+        "extract_clients": extract_clients,
+        "client_consolidator": client_consolidator,
+        "client_verifier": client_verifier,
+        "email_sender": email_sender,
+    }
+    if run_id and CHECKPOINT_ENABLED:
+        store = checkpoint_store or CheckpointStore()
+        nodes = {name: checkpointed(name, func, store, run_id, final=(name == "email_sender"))
+                 for name, func in nodes.items()}
+
+    process_document_node = nodes["document_processor"]
+
+    async def process_document(state: State) -> State:
+        # Runs on the workflow's own event loop so it shares the HTTP transport with the other nodes
+        update = await process_document_node(state)
+        if isinstance(update, dict):
+            # A resumed run gets a fresh temporary copy of the upload
+            update = {**update, "document_path": document_path, "document_name": file_name}
+        return update
+
+    nodes["document_processor"] = process_document
+    # Runs without checkpointing still get an ID so their metrics can be grouped
+    metrics_run_id = run_id or uuid.uuid4().hex
+    nodes = {name: instrumented(name, func, metrics_run_id) for name, func in nodes.items()}
+    if observer is not None:
+        nodes = {name: observed(name, func, observer) for name, func in nodes.items()}
+
     # Define nodes
-    workflow.add_node("document_processor", lambda state: asyncio.run(document_processor(state, document_path, file_name)))
-    workflow.add_node("client_identifier", client_identifier)
-    workflow.add_node("extract_images", extract_images)
-    workflow.add_node("extract_clients", extract_clients)
-    workflow.add_node("client_consolidator", client_consolidator)
-    workflow.add_node("client_verifier", client_verifier)
-    workflow.add_node("email_sender", email_sender)
-    
-    # Define a sequential workflow instead of branching
-    workflow.add_edge(START, "document_processor")
-    workflow.add_edge("document_processor", "client_identifier")
-    workflow.add_edge("document_processor", "extract_images")
-    workflow.add_edge("extract_images", "extract_clients")
-    workflow.add_edge("client_identifier", "client_consolidator")
-    workflow.add_edge("extract_clients", "client_consolidator")
-    workflow.add_edge("client_consolidator", "client_verifier")
-    workflow.add_edge("client_verifier", "email_sender")
-    workflow.add_edge("email_sender", END)
+    for name, func in nodes.items():
+        workflow.add_node(name, func)
+
+    # A node with several predecessors gets a single join edge so it runs once, after all of
+    # them; separate edges would run it (and everything after it) once per finished branch
+    predecessors = defaultdict(list)
+    for source, target in WORKFLOW_EDGES:
+        predecessors[target].append(source)
+    for target, sources in predecessors.items():
+        workflow.add_edge(sources if len(sources) > 1 else sources[0], target)
 
     # Set the entry point
     workflow.set_entry_point("document_processor")
     
     return workflow
 
+async def run_workflow(document_path: str, file_name: str, email_from_alias: str = "",
+                       run_id: Optional[str] = None, observer: Optional[Callable] = None) -> dict:
+    """Build, compile and run the workflow for one document, returning the final state."""
+    workflow = create_workflow_graph(document_path, file_name, run_id=run_id, observer=observer)
+    initial_state = State(email_from_alias=email_from_alias)
+    try:
+        return await workflow.compile().ainvoke(initial_state)
+    finally:
+        # File I/O, kept off the event loop that other documents' nodes share
+        await asyncio.to_thread(metrics.flush_events)
+        await asyncio.to_thread(metrics.write_prometheus)
+
 def visualize_graph():
     """Generate and save a visualization of the workflow graph."""
     try:
@@ -0,0 +1,146 @@
+import asyncio
+import logging
+import os
+import tempfile
+import time
+import uuid
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from src.checkpoint import make_run_id
+from src.graph import run_workflow
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+
+class QueueFullError(Exception):
+    """Raised when a job is submitted while the queue is at capacity."""
+
+
+class JobManager:
+    """
+    Runs workflow jobs on a fixed pool of worker tasks fed by a bounded queue.
+
+    Submissions beyond `queue_size` waiting jobs are rejected with QueueFullError
+    so callers can back off. Finished jobs are kept for status queries until
+    `retention` newer jobs have finished.
+    """
+
+    def __init__(self, workers: int = 4, queue_size: int = 32, retention: int = 1000, upload_dir: str = None):
+        self.workers = workers
+        self.retention = retention
+        self.upload_dir = upload_dir or tempfile.gettempdir()
+        self.queue = asyncio.Queue(maxsize=queue_size)
+        self.jobs = OrderedDict()
+        self._tasks = []
+
+    async def start(self):
+        os.makedirs(self.upload_dir, exist_ok=True)
+        self._tasks = [asyncio.create_task(self._worker(i)) for i in range(self.workers)]
+        logging.info(f"Job manager started with {self.workers} workers, queue size {self.queue.maxsize}")
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def submit(self, file_name: str, file_bytes: bytes, email_from_alias: str = "") -> Tuple[dict, bool]:
+        """
+        Queue a document for processing and return (job record, created). An upload
+        identical to a job that is still queued or running returns that job instead,
+        since both would share one checkpoint run and send the same emails.
+        """
+        # Jobs are held in memory only; after a restart, re-submitting the same upload
+        # resumes its checkpointed run.
+        run_id = make_run_id(file_bytes, email_from_alias)
+        for job in self.jobs.values():
+            if job["run_id"] == run_id and job["status"] in (QUEUED, RUNNING):
+                return job, False
+
+        if self.queue.full():
+            raise QueueFullError(f"Job queue is full ({self.queue.maxsize} jobs waiting)")
+
+        job_id = uuid.uuid4().hex
+        suffix = os.path.splitext(file_name)[1].lower()
+        with tempfile.NamedTemporaryFile(delete=False, suffix=suffix, dir=self.upload_dir) as tmp_file:
+            tmp_file.write(file_bytes)
+            document_path = tmp_file.name
+
+        job = {
+            "job_id": job_id,
+            "status": QUEUED,
+            "file_name": file_name,
+            "email_from_alias": email_from_alias,
+            "run_id": run_id,
+            "document_path": document_path,
+            "submitted_at": time.time(),
+            "started_at": None,
+            "finished_at": None,
+            "result": None,
+            "error": None,
+        }
+        self.jobs[job_id] = job
+        self.queue.put_nowait(job_id)
+        return job, True
+
+    def get(self, job_id: str) -> Optional[dict]:
+        return self.jobs.get(job_id)
+
+    def stats(self) -> dict:
+        counts = {QUEUED: 0, RUNNING: 0, SUCCEEDED: 0, FAILED: 0}
+        for job in self.jobs.values():
+            counts[job["status"]] += 1
+        return {"workers": self.workers, "queue_size": self.queue.maxsize, "queued": self.queue.qsize(), "jobs": counts}
+
+    async def _worker(self, worker_id: int):
+        while True:
+            job_id = await self.queue.get()
+            job = self.jobs.get(job_id)
+            try:
+                if job is not None:
+                    await self._run(job)
+            finally:
+                self.queue.task_done()
+
+    async def _run(self, job: dict):
+        job["status"] = RUNNING
+        job["started_at"] = time.time()
+        logging.info(f"Job {job['job_id']}: processing {job['file_name']}")
+        try:
+            final_state = await run_workflow(
+                job["document_path"],
+                job["file_name"],
+                job["email_from_alias"],
+                run_id=job["run_id"],
+            )
+            job["result"] = {
+                "clients_identified": final_state["clients_identified"],
+                "clients_from_images": final_state["clients_from_images"],
+                "verified_clients": final_state["verified_clients"],
+                "email_sent": final_state["email_sent"],
+                # Sends that failed; the same upload resumes and retries only these
+                "failed_recipients": final_state["failed_recipients"],
+                "document_content": final_state["document_content"][:1000],
+            }
+            job["status"] = SUCCEEDED
+        except Exception as e:
+            logging.error(f"Job {job['job_id']} failed: {str(e)}", exc_info=True)
+            job["error"] = str(e)
+            job["status"] = FAILED
+        finally:
+            job["finished_at"] = time.time()
+            if os.path.exists(job["document_path"]):
+                os.unlink(job["document_path"])
+            self._prune()
+
+    def _prune(self):
+        finished = [job_id for job_id, job in self.jobs.items() if job["status"] in (SUCCEEDED, FAILED)]
+        for job_id in finished[:max(0, len(finished) - self.retention)]:
+            del self.jobs[job_id]
@@ -0,0 +1,204 @@
+import contextvars
+import json
+import logging
+import os
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Optional
+
+from config import METRICS_ENABLED, METRICS_JSONL_PATH, METRICS_PROMETHEUS_PATH
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+# Run and node of the code currently executing, so model calls are tagged with them
+current_run_id = contextvars.ContextVar("current_run_id", default="")
+current_node = contextvars.ContextVar("current_node", default="")
+# Set by a checkpointed node that replays its stored result instead of running
+node_replayed = contextvars.ContextVar("node_replayed", default=False)
+
+DURATION_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+_lock = threading.Lock()
+_counters = defaultdict(float)
+_histograms = defaultdict(lambda: [0] * (len(DURATION_BUCKETS) + 1) + [0.0])
+# JSONL events wait here until flush_events, so no file I/O happens under _lock or on the event loop
+_pending_events = []
+_flush_lock = threading.Lock()
+
+
+def _observe(name: str, labels: tuple, seconds: float):
+    # Histogram layout: one count per bucket, the +Inf count, then the sum
+    histogram = _histograms[(name, labels)]
+    for index, bound in enumerate(DURATION_BUCKETS):
+        if seconds <= bound:
+            histogram[index] += 1
+    histogram[len(DURATION_BUCKETS)] += 1
+    histogram[-1] += seconds
+
+
+def _buffer_event(event: dict):
+    # Called with _lock held
+    if METRICS_JSONL_PATH:
+        _pending_events.append(event)
+
+
+def flush_events(path: str = METRICS_JSONL_PATH):
+    """Append the buffered events to the JSONL file. Does blocking file I/O, so run it off the event loop."""
+    with _flush_lock:
+        with _lock:
+            events = list(_pending_events)
+            _pending_events.clear()
+        if not events or not path:
+            return
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "a") as file:
+            file.writelines(json.dumps(event) + "\n" for event in events)
+
+
+def payload_bytes(update) -> int:
+    """Total size of the bytes values (document bytes, images) in a node's state update."""
+    if isinstance(update, (bytes, bytearray)):
+        return len(update)
+    if isinstance(update, (list, tuple)):
+        return sum(payload_bytes(item) for item in update)
+    if isinstance(update, dict):
+        return sum(payload_bytes(item) for item in update.values())
+    return 0
+
+
+def record_node(node: str, run_id: str, wall_seconds: float, cpu_seconds: float, payload: int = 0,
+                images: int = 0, error: bool = False, cached: bool = False):
+    """
+    Record one node execution. A `cached` node replayed its checkpoint instead of running,
+    so it is only counted and kept out of the run, CPU and duration metrics.
+    """
+    if not METRICS_ENABLED:
+        return
+    labels = (("node", node),)
+    with _lock:
+        if cached:
+            _counters[("workflow_node_cached_total", labels)] += 1
+            _buffer_event({
+                "ts": time.time(), "type": "node", "run_id": run_id, "node": node,
+                "wall_s": wall_seconds, "cpu_s": cpu_seconds, "payload_bytes": payload,
+                "images": images, "error": error, "cached": True,
+            })
+            return
+        _counters[("workflow_node_runs_total", labels)] += 1
+        _counters[("workflow_node_errors_total", labels)] += int(error)
+        _counters[("workflow_node_cpu_seconds_total", labels)] += cpu_seconds
+        _counters[("workflow_node_payload_bytes_total", labels)] += payload
+        _counters[("workflow_node_images_total", labels)] += images
+        _observe("workflow_node_duration_seconds", labels, wall_seconds)
+        _buffer_event({
+            "ts": time.time(), "type": "node", "run_id": run_id, "node": node,
+            "wall_s": wall_seconds, "cpu_s": cpu_seconds, "payload_bytes": payload,
+            "images": images, "error": error, "cached": False,
+        })
+
+
+def record_model_call(model: str, wall_seconds: float, input_tokens: int = 0, output_tokens: int = 0,
+                      payload: int = 0, error: bool = False):
+    """Record one model call, tagged with the current run and node."""
+    if not METRICS_ENABLED:
+        return
+    node = current_node.get()
+    labels = (("model", model), ("node", node))
+    with _lock:
+        _counters[("model_calls_total", labels)] += 1
+        _counters[("model_call_errors_total", labels)] += int(error)
+        _counters[("model_input_tokens_total", labels)] += input_tokens
+        _counters[("model_output_tokens_total", labels)] += output_tokens
+        _counters[("model_payload_bytes_total", labels)] += payload
+        _observe("model_call_duration_seconds", labels, wall_seconds)
+        _buffer_event({
+            "ts": time.time(), "type": "model_call", "run_id": current_run_id.get(), "node": node,
+            "model": model, "wall_s": wall_seconds, "input_tokens": input_tokens,
+            "output_tokens": output_tokens, "payload_bytes": payload, "error": error,
+        })
+
+
+def run_usage(result) -> dict:
+    """Token usage of an agents SDK run result (zero when unavailable)."""
+    usage = getattr(getattr(result, "context_wrapper", None), "usage", None)
+    return {
+        "input_tokens": getattr(usage, "input_tokens", 0) or 0,
+        "output_tokens": getattr(usage, "output_tokens", 0) or 0,
+    }
+
+
+def completion_usage(response) -> dict:
+    """Token usage of a chat completion response (zero when unavailable)."""
+    usage = getattr(response, "usage", None)
+    return {
+        "input_tokens": getattr(usage, "prompt_tokens", 0) or 0,
+        "output_tokens": getattr(usage, "completion_tokens", 0) or 0,
+    }
+
+
+@contextmanager
+def model_call(model: str, payload: int = 0):
+    """
+    Time a model call and record it. Set "input_tokens" / "output_tokens" on the
+    yielded dict (see run_usage and completion_usage) once the response is in.
+    """
+    usage = {"input_tokens": 0, "output_tokens": 0}
+    started = time.perf_counter()
+    error = False
+    try:
+        yield usage
+    except Exception:
+        error = True
+        raise
+    finally:
+        record_model_call(model, time.perf_counter() - started, usage["input_tokens"],
+                          usage["output_tokens"], payload, error)
+
+
+def _format_labels(labels: tuple, extra: Optional[tuple] = None) -> str:
+    pairs = list(labels) + list(extra or ())
+    if not pairs:
+        return ""
+    escaped = (str(value).replace("\\", "\\\\").replace('"', '\\"') for _, value in pairs)
+    return "{" + ",".join(f'{key}="{value}"' for (key, _), value in zip(pairs, escaped)) + "}"
+
+
+def render_prometheus() -> str:
+    """Render all metrics in the Prometheus text exposition format."""
+    with _lock:
+        counters = dict(_counters)
+        histograms = {key: list(value) for key, value in _histograms.items()}
+
+    lines = []
+    for name in sorted({name for name, _ in counters}):
+        lines.append(f"# TYPE {name} counter")
+        for (metric, labels), value in sorted(counters.items()):
+            if metric == name:
+                lines.append(f"{name}{_format_labels(labels)} {value:g}")
+
+    for name in sorted({name for name, _ in histograms}):
+        lines.append(f"# TYPE {name} histogram")
+        for (metric, labels), histogram in sorted(histograms.items()):
+            if metric != name:
+                continue
+            for bound, count in zip(DURATION_BUCKETS, histogram):
+                lines.append(f"{name}_bucket{_format_labels(labels, (('le', f'{bound:g}'),))} {count}")
+            lines.append(f"{name}_bucket{_format_labels(labels, (('le', '+Inf'),))} {histogram[len(DURATION_BUCKETS)]}")
+            lines.append(f"{name}_sum{_format_labels(labels)} {histogram[-1]:g}")
+            lines.append(f"{name}_count{_format_labels(labels)} {histogram[len(DURATION_BUCKETS)]}")
+    return "\n".join(lines) + "\n"
+
+
+def write_prometheus(path: str = METRICS_PROMETHEUS_PATH):
+    """Write the Prometheus text format to a file (e.g. for a node_exporter textfile collector)."""
+    if not METRICS_ENABLED or not path:
+        return
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    # Runs finishing together write from different threads, so each needs its own temporary file
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "w") as file:
+        file.write(render_prometheus())
+    os.replace(tmp_path, path)
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from typing import Annotated
 
 class ClientInfo(BaseModel):
@@ -8,6 +8,17 @@ class ClientInfo(BaseModel):
 class ClientIdentificationResult(BaseModel):
     clients: List[ClientInfo]
 
+class TieredClientIdentificationResult(BaseModel):
+    clients: List[ClientInfo]
+    confidence: float = Field(description="0 to 1: how sure the agent is that the client list is complete and correct")
+
+class PrefilterResult(BaseModel):
+    text: str
+    tokens_before: int
+    tokens_after: int
+    sentences_total: int
+    sentences_kept: int
+
 class State(BaseModel):
     document_content:  str = ""
     document_path: str = ""
@@ -15,8 +26,15 @@ class State(BaseModel):
     clients_identified: List[str]=[]
     verified_clients: List[str]=[]
     email_sent: Optional[bool] = False
+    failed_recipients: List[str]=[]
+    sent_recipients: List[Tuple[str, str, str]]=[]  # (client, assistant name, email) already emailed in this run
     email_from_alias: str = ""
     images: list = []
     clients_from_images: List[str]=[]
     document_bytes: bytes = b""
-    consolidated_clients: List[str]=[]
\ No newline at end of file
+    consolidated_clients: List[str]=[]
+    document_id: str = ""
+    revision_of: str = ""
+    paragraphs: List[str]=[]
+    identification_tokens_before: int = 0
+    identification_tokens_after: int = 0
\ No newline at end of file
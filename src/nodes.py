@@ -1,29 +1,30 @@
+import asyncio
 import logging
 from src.models import State
 from src.agents import (
+    agent_run_config,
     doc_processing_agent,
-    clients_identification_agent,
+    get_openai_client,
 )
-import base64
 from src.utils import (
     verify_client,
-    getCleanNames,
     save_info_in_file,
     get_assistants_for_client,
     send_email_with_doc_attached,
     get_email_template
     )
 from src.document_processor import extract_images_from_pdf, extract_images_from_docx
-from config import TEXT_TO_IMAGE_IDENTIFICATION_MODEL
+from src.prefilter import prefilter_document, count_tokens
+from src.revisions import RevisionStore, attribute_clients, fingerprint, split_paragraphs
+from src.routing import identify_text_clients, identify_image_clients, image_models, text_models
+from src.metrics import model_call, run_usage
+from src.tools import read_document
+from config import CLIENT_IDENTIFICATION_MODEL, DOC_PROCESSING_MODEL, REVISION_ENABLED
 from agents import Runner
-from openai import OpenAI
-import re
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(message)s')
 
-client = OpenAI()
-
 # # Define the workflow nodes
 async def document_processor(state: State,document_path:str,file_name:str) -> State:
     """Process the document and extract its content."""
@@ -32,18 +33,36 @@ async def document_processor(state: State,document_path:str,file_name:str) -> St
 
         with open(document_path, "rb") as f:
             file_bytes = f.read()
-    
-        result = await Runner.run(
-            doc_processing_agent,
-            [{"role": "user", "content": document_path}],
-        )
 
-        document_content = result.final_output 
+        # Paragraph fingerprints come from the local parser so they are stable across runs
+        paragraphs, previous_version = [], ""
+        if REVISION_ENABLED:
+            local_content = await asyncio.to_thread(read_document, document_path)
+            if not local_content.startswith("Error"):
+                paragraphs = split_paragraphs(local_content)
+                previous_version = RevisionStore().find_previous_version(file_name, paragraphs) or ""
+
+        if previous_version:
+            # A revision of a known document: the parsed text is all the agent would return
+            document_content = local_content
+        else:
+            client = get_openai_client()
+            with model_call(DOC_PROCESSING_MODEL, len(document_path.encode("utf-8"))) as usage:
+                result = await Runner.run(
+                    doc_processing_agent,
+                    [{"role": "user", "content": document_path}],
+                    run_config=agent_run_config(client),
+                )
+                usage.update(run_usage(result))
+            document_content = result.final_output 
         
         return{"document_content": document_content,
                 "document_path": document_path,
                 "document_name": file_name,
-                "document_bytes": file_bytes}
+                "document_bytes": file_bytes,
+                "document_id": fingerprint(file_bytes),
+                "revision_of": previous_version,
+                "paragraphs": paragraphs}
     
     except Exception as e:
         logging.error(f"Error in document processing: {str(e)}", exc_info=True)
@@ -54,14 +73,55 @@ async def client_identifier(state: State) -> State:
     try:
         logging.info("Identifying clients in document based on text")
 
-        result = await Runner.run(
-            clients_identification_agent,
-            state.document_content
+        store = RevisionStore() if REVISION_ENABLED and state.paragraphs else None
+        fingerprints = [fingerprint(paragraph) for paragraph in state.paragraphs]
+        # Only results from models the current routing could have used are reused
+        previous = store.paragraph_clients(state.revision_of, text_models()) if store and state.revision_of else {}
+
+        if state.revision_of:
+            # Only paragraphs that are new in this revision go to the model
+            analysed = [i for i, fp in enumerate(fingerprints) if fp not in previous]
+            text = "\n".join(state.paragraphs[i] for i in analysed)
+            logging.info(f"Revision of {state.revision_of}: {len(analysed)}/{len(fingerprints)} paragraphs changed")
+        else:
+            analysed = list(range(len(fingerprints)))
+            text = state.document_content
+        reused_clients = [client for fp in fingerprints if fp in previous for client in previous[fp][1]]
+
+        tokens_before = count_tokens(state.document_content, CLIENT_IDENTIFICATION_MODEL)
+        tokens_after = 0
+        model_clients, text_model = [], ""
+        if text.strip():
+            # Only the sentences likely to mention clients are sent to the model
+            prefiltered = prefilter_document(text, model=CLIENT_IDENTIFICATION_MODEL)
+            tokens_after = prefiltered.tokens_after
+            logging.info(
+                f"Prefilter kept {prefiltered.sentences_kept}/{prefiltered.sentences_total} sentences, "
+                f"{tokens_before} -> {tokens_after} tokens"
+            )
+
+            client = get_openai_client()
+            model_clients, text_model = await identify_text_clients(client, prefiltered.text, tokens_after)
+
+        save_info_in_file(
+            f"tokens before: {tokens_before}, tokens after: {tokens_after}",
+            "CLIENT IDENTIFICATION PREFILTER"
         )
-        identified_clients = [client.name for client in result.final_output.clients]
+        identified_clients = list(dict.fromkeys(model_clients + reused_clients))
         save_info_in_file(identified_clients, "IDENTIFIED CLIENTS FROM DOC TEXT")
 
-        return {"clients_identified": identified_clients}
+        if store:
+            assigned = attribute_clients(state.paragraphs, model_clients, analysed)
+            store.record_document(
+                state.document_id,
+                state.document_name,
+                [(fp, *previous[fp]) if fp in previous else (fp, text_model, assigned[i])
+                 for i, fp in enumerate(fingerprints)],
+            )
+
+        return {"clients_identified": identified_clients,
+                "identification_tokens_before": tokens_before,
+                "identification_tokens_after": tokens_after}
     except Exception as e:
         logging.error(f"Error in client identification: {str(e)}", exc_info=True)
         return state
@@ -85,10 +145,11 @@ async def extract_images(state: State) -> State:
     file_name = state.document_name.lower()
     file_bytes = state.document_bytes
     
+    # Rendering and decoding images is CPU bound; keep it off the event loop
     if file_name.endswith(".pdf"):
-        images = extract_images_from_pdf(file_bytes)
+        images = await asyncio.to_thread(extract_images_from_pdf, file_bytes)
     elif file_name.endswith(".docx"):
-        images = extract_images_from_docx(file_bytes)
+        images = await asyncio.to_thread(extract_images_from_docx, file_bytes)
     else:
         raise ValueError("Unsupported file type. Only .pdf and .docx are supported.")
     
@@ -103,42 +164,26 @@ async def extract_clients(state: State) -> State:
         logging.info("Extracting Client Names from document images")
 
         images = state.images
-        extracted_names = []
-
-        for img_bytes in images:
-            img_b64 = base64.b64encode(img_bytes).decode()
-
-            response = client.chat.completions.create(
-                model=TEXT_TO_IMAGE_IDENTIFICATION_MODEL,
-                messages=[
-                    {
-                        "role": "user",
-                        "content": [
-                            {"type": "text", 
-                             "text":
-                             """You are an expert in extracting client-related names from images. Your task is to analyze the provided image base64 string and identify all client-related names, such as:
-                                - Company names
-                                - Business entities
-                                - Organizations
-
-                                Guidelines for Extraction:
-                                - Focus only on client-related names; ignore unrelated text or general information or other unrelated text.
-                                - Ensure accuracy and context awareness to differentiate between actual client names and other text.
-                                - Consider variations of client names (e.g., "ABC Corp." vs. "ABC Corporation").
-                                - Return the extracted names as a Python list of strings, with each name as a separate list item.
-
-                                Example Output:
-                                ["Microsoft", "Amazon"]"""
-                              },
-                            {"type": "image_url", "image_url": {"url": f"data:image/png;base64,{img_b64}"}}
-                        ]
-                    }
-                ]
-            )
-            cleaned_list = re.split(r'\n-?\s*', response.choices[0].message.content.strip())  # handles both "\n" and "\n- " styles
-            extracted_names.extend([item for item in cleaned_list if item])  
-        
-        clients_from_images = getCleanNames(extracted_names)
+        client = get_openai_client()
+
+        # Images analysed before (e.g. in an earlier revision) are not sent again
+        store = RevisionStore() if REVISION_ENABLED else None
+        image_fingerprints = [fingerprint(img_bytes) for img_bytes in images]
+        cached = store.image_clients(image_fingerprints, image_models()) if store else {}
+        new_images = {fp: img_bytes for fp, img_bytes in zip(image_fingerprints, images) if fp not in cached}
+        logging.info(f"{len(new_images)}/{len(images)} images need analysis")
+
+        results_by_image = {}
+        for fp, img_bytes in new_images.items():
+            names, model = await identify_image_clients(client, img_bytes)
+            results_by_image[fp] = (model, names)
+
+        if store and results_by_image:
+            store.record_images(results_by_image)
+        clients_by_image = {fp: names for fp, (_, names) in results_by_image.items()}
+
+        clients_from_images = sorted({name for fp in image_fingerprints
+                                      for name in cached.get(fp, clients_by_image.get(fp, []))})
         save_info_in_file(clients_from_images, "CLIENTS FROM IMAGES USED IN DOCUMENT")
         
         return {"clients_from_images": clients_from_images}  
@@ -165,7 +210,10 @@ async def client_consolidator(state: State) -> State:
 async def email_sender(state: State) -> State:
     """Send the email with the document attached."""
 
-    email_sent = False  # Track if any email was successfully sent
+    email_sent = bool(state.email_sent)  # Track if any email was successfully sent
+    failed_recipients = []  # Recipients whose send failed, so the run is not treated as complete
+    # A resumed run only retries the sends that failed last time
+    sent_recipients = [tuple(pair) for pair in state.sent_recipients]
 
     try:
         for client in state.verified_clients:
@@ -174,13 +222,19 @@ async def email_sender(state: State) -> State:
                 print(f"Assistants for {client}:")
                 for assistant in assistants:
                     print(f"- Name: {assistant['name']}, Email: {assistant['email']}")
+                    recipient = (client, assistant['name'], assistant['email'])
+                    if recipient in sent_recipients:
+                        logging.info(f"Already sent to {assistant['name']} ({assistant['email']}) for {client} in this run")
+                        continue
                     subject, body= get_email_template()
                     formatted_subject = subject.replace("[client_name]", client)
                     formatted_body = body.replace("[recipient_name]", assistant['name'])
 
                     logging.info(f"---------------Sending email to {assistant['name']} ({assistant['email']})---------------")
 
-                    result = send_email_with_doc_attached(assistant['email'],
+                    # smtplib blocks, so send from a thread to keep other documents progressing
+                    result = await asyncio.to_thread(send_email_with_doc_attached,
+                                                           assistant['email'],
                                                            formatted_subject,
                                                            formatted_body,
                                                             state.document_path,
@@ -189,13 +243,18 @@ async def email_sender(state: State) -> State:
                     
                     if "successfully" in result.lower():
                         email_sent = True
+                        sent_recipients.append(recipient)
+                    else:
+                        failed_recipients.append(assistant['email'])
                     
             else:
                 print(f"No assistants found for client: {client}")
                 logging.info(f"No assistants found for client: {client}")
         
         return {
-            "email_sent": email_sent
+            "email_sent": email_sent,
+            "failed_recipients": failed_recipients,
+            "sent_recipients": sent_recipients
         }
             
     except Exception as e:
@@ -0,0 +1,141 @@
+import logging
+import re
+from functools import lru_cache
+from typing import List
+
+from config import (
+    PREFILTER_ENABLED,
+    PREFILTER_RECALL_MARGIN,
+    PREFILTER_MIN_TOKENS,
+    PREFILTER_MAX_KEEP_RATIO,
+)
+from src.models import PrefilterResult
+from src.utils import get_registry_aliases
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+LEGAL_SUFFIXES = [
+    "Inc", "Incorporated", "Corp", "Corporation", "Co", "Company", "Ltd", "Limited",
+    "LLC", "LLP", "PLC", "AG", "AB", "ASA", "A/S", "Oyj", "Oy", "GmbH", "SA", "SE",
+    "NV", "BV", "SpA", "KK", "Group", "Holdings",
+]
+
+# A capitalised word, optionally joined with "&", "of" or "and" (e.g. "Procter & Gamble")
+_CAP_WORD = r"[A-Z][\w'&.-]*"
+_CAPITALISED_SPAN = re.compile(rf"\b{_CAP_WORD}(?:\s+(?:&\s+|of\s+|and\s+)?{_CAP_WORD})+")
+_LEGAL_SUFFIX = re.compile(
+    rf"\b{_CAP_WORD}(?:\s+{_CAP_WORD})*,?\s+(?:{'|'.join(re.escape(s) for s in LEGAL_SUFFIXES)})\b\.?"
+)
+_SENTENCE_BREAK = re.compile(r"(?<=[.!?])\s+(?=[A-Z0-9\"'(])")
+_TABLE_CELL_SEPARATOR = " | "
+
+
+def count_tokens(text: str, model: str = "gpt-4o") -> int:
+    """Count tokens with tiktoken when it is installed, otherwise estimate ~4 characters per token."""
+    encoding = _get_encoding(model)
+    if encoding is None:
+        return (len(text) + 3) // 4
+    return len(encoding.encode(text))
+
+
+@lru_cache(maxsize=None)
+def _get_encoding(model: str):
+    """Return the tiktoken encoding for a model, or None when it cannot be loaded."""
+    try:
+        import tiktoken
+    except ImportError:
+        return None
+
+    # tiktoken downloads encoding files on first use, which fails on offline hosts
+    try:
+        try:
+            return tiktoken.encoding_for_model(model)
+        except KeyError:
+            return tiktoken.get_encoding("o200k_base")
+    except Exception as e:
+        logging.warning(f"Falling back to estimated token counts, tiktoken encoding unavailable: {str(e)}")
+        return None
+
+
+def split_sentences(text: str) -> List[str]:
+    """Split document text into sentences. Lines are kept apart so table rows and headings stay intact."""
+    sentences = []
+    for line in text.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        if _TABLE_CELL_SEPARATOR in line:
+            sentences.append(line)
+        else:
+            sentences.extend(s for s in _SENTENCE_BREAK.split(line) if s.strip())
+    return sentences
+
+
+def _has_alias(sentence: str, aliases: List[str]) -> bool:
+    lowered = sentence.lower()
+    return any(re.search(rf"(?<!\w){re.escape(alias.lower())}(?!\w)", lowered) for alias in aliases)
+
+
+def is_candidate(sentence: str, aliases: List[str]) -> bool:
+    """Return True when the sentence is likely to mention an organisation."""
+    if _has_alias(sentence, aliases):
+        return True
+    # Bare acronyms ("AI", "ROI") are too common to count; known ones are registry aliases
+    if _LEGAL_SUFFIX.search(sentence):
+        return True
+    if _TABLE_CELL_SEPARATOR in sentence:
+        # Table cells are short and often hold bare names, so any capitalised cell counts
+        return any(cell.strip()[:1].isupper() for cell in sentence.split("|"))
+
+    # Ignore the first word: it is capitalised because it starts the sentence
+    first_word = re.match(r"\s*\S+\s*", sentence)
+    remainder = sentence[first_word.end():] if first_word else sentence
+    return bool(_CAPITALISED_SPAN.search(remainder))
+
+
+def prefilter_document(text: str, recall_margin: int = PREFILTER_RECALL_MARGIN, model: str = "gpt-4o") -> PrefilterResult:
+    """
+    Keep only the sentences that are likely to mention clients, plus `recall_margin`
+    sentences on either side of each match, so less text is sent to the identification model.
+    """
+    tokens_before = count_tokens(text, model)
+    sentences = split_sentences(text)
+    unfiltered = PrefilterResult(
+        text=text,
+        tokens_before=tokens_before,
+        tokens_after=tokens_before,
+        sentences_total=len(sentences),
+        sentences_kept=len(sentences),
+    )
+
+    if not PREFILTER_ENABLED or tokens_before < PREFILTER_MIN_TOKENS:
+        return unfiltered
+
+    aliases = get_registry_aliases()
+    keep = set()
+    for index, sentence in enumerate(sentences):
+        if is_candidate(sentence, aliases):
+            keep.update(range(max(0, index - recall_margin), min(len(sentences), index + recall_margin + 1)))
+
+    # Filtering that keeps most of the document saves little and only costs recall
+    if len(keep) > PREFILTER_MAX_KEEP_RATIO * len(sentences):
+        return unfiltered
+
+    # Non-adjacent windows are separated so the model does not read them as one passage
+    windows = []
+    previous = None
+    for index in sorted(keep):
+        if previous is not None and index != previous + 1:
+            windows.append("...")
+        windows.append(sentences[index])
+        previous = index
+
+    filtered_text = "\n".join(windows)
+    return PrefilterResult(
+        text=filtered_text,
+        tokens_before=tokens_before,
+        tokens_after=count_tokens(filtered_text, model),
+        sentences_total=len(sentences),
+        sentences_kept=len(keep),
+    )
@@ -0,0 +1,179 @@
+import hashlib
+import json
+import logging
+import os
+import re
+import sqlite3
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+
+from config import REVISION_DB_PATH, REVISION_MATCH_THRESHOLD, REVISION_MATCH_CANDIDATES
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+# Version markers stripped from file names to find earlier revisions of the same report,
+# e.g. "Report_v2.docx", "Report - rev 3.docx", "Report (1).docx", "Report_final.docx"
+_VERSION_MARKER = re.compile(r"[\s_\-.]*(?:v\d+|rev(?:ision)?\s*\d*|final|draft|copy|\(\d+\))(?=[\s_\-.]|$)", re.IGNORECASE)
+
+
+def fingerprint(data) -> str:
+    """Fingerprint a paragraph (whitespace-insensitive) or an image's bytes."""
+    if isinstance(data, str):
+        data = " ".join(data.split()).encode("utf-8")
+    return hashlib.sha256(data).hexdigest()
+
+
+def split_paragraphs(text: str) -> List[str]:
+    """Split extracted document text into its non-empty paragraphs."""
+    return [line.strip() for line in text.splitlines() if line.strip()]
+
+
+def lineage_key(file_name: str) -> str:
+    """Normalise a file name so successive versions of one document share a key."""
+    stem = os.path.splitext(os.path.basename(file_name))[0]
+    return _VERSION_MARKER.sub("", stem).strip(" _-.").lower()
+
+
+class RevisionStore:
+    """
+    SQLite store of per-paragraph and per-image fingerprints for processed documents,
+    with the clients found in each, so a revised document only needs its changes analysed.
+    """
+
+    def __init__(self, db_path: Optional[str] = None):
+        # Looked up at call time so the stub backends can point it at a scratch store
+        self.db_path = db_path or REVISION_DB_PATH
+        os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS documents ("
+                " document_id TEXT PRIMARY KEY, lineage TEXT NOT NULL, file_name TEXT NOT NULL,"
+                " fingerprints TEXT NOT NULL, created_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS documents_lineage ON documents (lineage)")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS paragraph_results ("
+                " document_id TEXT NOT NULL, fingerprint TEXT NOT NULL, model TEXT NOT NULL,"
+                " clients TEXT NOT NULL, PRIMARY KEY (document_id, fingerprint))"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS image_results ("
+                " fingerprint TEXT NOT NULL, model TEXT NOT NULL, clients TEXT NOT NULL,"
+                " created_at REAL NOT NULL, PRIMARY KEY (fingerprint, model))"
+            )
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def find_previous_version(self, file_name: str, paragraphs: List[str]) -> Optional[str]:
+        """
+        Return the ID of the stored document this one most likely revises: among
+        documents with the same lineage key and the most recent uploads, the one
+        sharing the largest share of paragraphs, if it reaches REVISION_MATCH_THRESHOLD.
+        """
+        current = {fingerprint(paragraph) for paragraph in paragraphs}
+        if not current:
+            return None
+
+        with self._connect() as conn:
+            candidates = conn.execute(
+                "SELECT document_id, fingerprints FROM documents WHERE lineage = ?"
+                " UNION SELECT document_id, fingerprints FROM"
+                " (SELECT document_id, fingerprints FROM documents ORDER BY created_at DESC LIMIT ?)",
+                (lineage_key(file_name), REVISION_MATCH_CANDIDATES),
+            ).fetchall()
+
+        best_id, best_score = None, 0.0
+        for document_id, stored in candidates:
+            previous = set(json.loads(stored))
+            score = len(current & previous) / len(current | previous)
+            if score > best_score:
+                best_id, best_score = document_id, score
+
+        if best_score < REVISION_MATCH_THRESHOLD:
+            return None
+        logging.info(f"Matched upload to previous version {best_id} ({best_score:.0%} paragraphs shared)")
+        return best_id
+
+    def paragraph_clients(self, document_id: str, models: List[str]) -> Dict[str, Tuple[str, List[str]]]:
+        """
+        Return {paragraph fingerprint: (model, clients)} for the paragraphs of a stored
+        document that were analysed by one of `models`.
+        """
+        if not models:
+            return {}
+        placeholders = ", ".join("?" for _ in models)
+        with self._connect() as conn:
+            rows = conn.execute(
+                f"SELECT fingerprint, model, clients FROM paragraph_results"
+                f" WHERE document_id = ? AND model IN ({placeholders})",
+                [document_id] + list(models),
+            ).fetchall()
+        return {fp: (model, json.loads(clients)) for fp, model, clients in rows}
+
+    def record_document(self, document_id: str, file_name: str, paragraphs: List[Tuple[str, str, List[str]]]):
+        """Store a processed document as a list of (paragraph fingerprint, model, clients)."""
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO documents (document_id, lineage, file_name, fingerprints, created_at)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (document_id, lineage_key(file_name), file_name,
+                 json.dumps([fp for fp, _, _ in paragraphs]), time.time()),
+            )
+            conn.execute("DELETE FROM paragraph_results WHERE document_id = ?", (document_id,))
+            conn.executemany(
+                "INSERT OR REPLACE INTO paragraph_results (document_id, fingerprint, model, clients)"
+                " VALUES (?, ?, ?, ?)",
+                [(document_id, fp, model, json.dumps(clients)) for fp, model, clients in paragraphs],
+            )
+
+    def image_clients(self, fingerprints: List[str], models: List[str]) -> Dict[str, List[str]]:
+        """
+        Return cached clients for the images analysed before by one of `models`, so
+        results from a different (or stand-in) model are never reused.
+        """
+        if not fingerprints or not models:
+            return {}
+        fp_placeholders = ", ".join("?" for _ in fingerprints)
+        model_placeholders = ", ".join("?" for _ in models)
+        with self._connect() as conn:
+            rows = conn.execute(
+                f"SELECT fingerprint, clients FROM image_results"
+                f" WHERE fingerprint IN ({fp_placeholders}) AND model IN ({model_placeholders})"
+                f" ORDER BY created_at",
+                list(fingerprints) + list(models),
+            ).fetchall()
+        # Ordered oldest first, so the most recent result for an image wins
+        return {fp: json.loads(clients) for fp, clients in rows}
+
+    def record_images(self, results: Dict[str, Tuple[str, List[str]]]):
+        """Store {image fingerprint: (model, clients)} for the images just analysed."""
+        with self._connect() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO image_results (fingerprint, model, clients, created_at) VALUES (?, ?, ?, ?)",
+                [(fp, model, json.dumps(clients), time.time()) for fp, (model, clients) in results.items()],
+            )
+
+
+def attribute_clients(paragraphs: List[str], clients: List[str], analysed: List[int]) -> List[List[str]]:
+    """
+    Assign each client to the paragraphs that mention it by name. A client the model
+    reported without a literal mention (e.g. a name variant) is assigned to every
+    analysed paragraph, so it is kept for as long as any of that text survives.
+    """
+    assigned = [[] for _ in paragraphs]
+    for client in clients:
+        pattern = re.compile(rf"(?<!\w){re.escape(client)}(?!\w)", re.IGNORECASE)
+        mentioned = [index for index, paragraph in enumerate(paragraphs) if pattern.search(paragraph)]
+        for index in mentioned or analysed:
+            assigned[index].append(client)
+    return assigned
@@ -0,0 +1,239 @@
+import base64
+import json
+import logging
+import re
+import threading
+import time
+from collections import defaultdict, deque
+from typing import List, Tuple
+
+from agents import Runner
+from config import (
+    CLIENT_IDENTIFICATION_MODEL,
+    TEXT_TO_IMAGE_IDENTIFICATION_MODEL,
+    TIERED_ROUTING_ENABLED,
+    TEXT_FAST_MODEL,
+    TEXT_ESCALATION_CONFIDENCE,
+    TEXT_COMPLEXITY_TOKENS,
+    IMAGE_FAST_MODEL,
+    IMAGE_ESCALATION_CONFIDENCE,
+    IMAGE_COMPLEXITY_BYTES,
+)
+from src.agents import agent_run_config, clients_identification_agent, fast_clients_identification_agent
+from src.metrics import model_call, run_usage, completion_usage
+from src.utils import getCleanNames, get_registry_aliases, percentile
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+IMAGE_IDENTIFICATION_PROMPT = """You are an expert in extracting client-related names from images. Your task is to analyze the provided image base64 string and identify all client-related names, such as:
+                                - Company names
+                                - Business entities
+                                - Organizations
+
+                                Guidelines for Extraction:
+                                - Focus only on client-related names; ignore unrelated text or general information or other unrelated text.
+                                - Ensure accuracy and context awareness to differentiate between actual client names and other text.
+                                - Consider variations of client names (e.g., "ABC Corp." vs. "ABC Corporation").
+                                - Return the extracted names as a Python list of strings, with each name as a separate list item.
+
+                                Example Output:
+                                ["Microsoft", "Amazon"]"""
+
+FAST_IMAGE_IDENTIFICATION_PROMPT = """You are an expert in extracting client-related names from images. Identify all company names, business entities and organizations shown in the image.
+Ignore unrelated text. Respond with a JSON object with two keys:
+ - "names": list of the client names found
+ - "confidence": a number from 0 to 1 for how sure you are that the list is complete and correct (use a low value for blurry, dense or ambiguous images)
+
+Example Output:
+{"names": ["Microsoft", "Amazon"], "confidence": 0.9}"""
+
+# Escalation and per-tier latency statistics, per stage ("text" / "image")
+_stats_lock = threading.Lock()
+_calls = defaultdict(int)
+_escalations = defaultdict(lambda: defaultdict(int))
+_tier_latencies = defaultdict(lambda: deque(maxlen=1000))
+
+
+def _record_latency(stage: str, tier: str, started: float):
+    with _stats_lock:
+        _tier_latencies[(stage, tier)].append(time.perf_counter() - started)
+
+
+def _record_escalation(stage: str, reason: str):
+    logging.info(f"Escalating {stage} client identification to the strong model: {reason}")
+    with _stats_lock:
+        _escalations[stage][reason] += 1
+
+
+def registry_matches(text: str) -> List[str]:
+    """Return the registry clients mentioned by name in the text (tier 0, no model call)."""
+    return [alias for alias in get_registry_aliases()
+            if re.search(rf"(?<!\w){re.escape(alias)}(?!\w)", text, re.IGNORECASE)]
+
+
+async def _run_strong_text(client, text: str) -> Tuple[List[str], str]:
+    started = time.perf_counter()
+    with model_call(CLIENT_IDENTIFICATION_MODEL, len(text.encode("utf-8"))) as usage:
+        result = await Runner.run(clients_identification_agent, text, run_config=agent_run_config(client))
+        usage.update(run_usage(result))
+    _record_latency("text", CLIENT_IDENTIFICATION_MODEL, started)
+    return [client.name for client in result.final_output.clients], CLIENT_IDENTIFICATION_MODEL
+
+
+async def identify_text_clients(client, text: str, token_count: int) -> Tuple[List[str], str]:
+    """
+    Identify clients in document text and return (names, model that produced them). In tiered mode the fast model answers first
+    and the strong model is only used when the document is long, the fast model
+    fails or is not confident, or it misses a registry client that is named in the text.
+    """
+    with _stats_lock:
+        _calls["text"] += 1
+    if not TIERED_ROUTING_ENABLED:
+        return await _run_strong_text(client, text)
+
+    if token_count > TEXT_COMPLEXITY_TOKENS:
+        _record_escalation("text", "complexity")
+        return await _run_strong_text(client, text)
+
+    started = time.perf_counter()
+    registry = registry_matches(text)
+    _record_latency("text", "registry", started)
+
+    started = time.perf_counter()
+    try:
+        with model_call(TEXT_FAST_MODEL, len(text.encode("utf-8"))) as usage:
+            result = await Runner.run(fast_clients_identification_agent, text, run_config=agent_run_config(client))
+            usage.update(run_usage(result))
+    except Exception as e:
+        # Timeouts, rate limits and invalid structured output fall back to the strong model
+        logging.warning(f"Fast text model failed: {str(e)}")
+        _record_escalation("text", "error")
+        return await _run_strong_text(client, text)
+    _record_latency("text", TEXT_FAST_MODEL, started)
+    names = [client.name for client in result.final_output.clients]
+
+    found = {name.lower() for name in names}
+    if result.final_output.confidence < TEXT_ESCALATION_CONFIDENCE:
+        _record_escalation("text", "low_confidence")
+    elif any(client.lower() not in found for client in registry):
+        _record_escalation("text", "conflict")
+    else:
+        return names, TEXT_FAST_MODEL
+    return await _run_strong_text(client, text)
+
+
+def text_models() -> List[str]:
+    """Models whose stored paragraph results may be reused under the current routing mode."""
+    if TIERED_ROUTING_ENABLED:
+        return [TEXT_FAST_MODEL, CLIENT_IDENTIFICATION_MODEL]
+    return [CLIENT_IDENTIFICATION_MODEL]
+
+
+def image_models() -> List[str]:
+    """Models whose cached image results may be reused under the current routing mode."""
+    if TIERED_ROUTING_ENABLED:
+        return [IMAGE_FAST_MODEL, TEXT_TO_IMAGE_IDENTIFICATION_MODEL]
+    return [TEXT_TO_IMAGE_IDENTIFICATION_MODEL]
+
+
+async def _run_strong_image(client, img_b64: str) -> Tuple[List[str], str]:
+    started = time.perf_counter()
+    with model_call(TEXT_TO_IMAGE_IDENTIFICATION_MODEL, len(img_b64)) as usage:
+        response = await client.chat.completions.create(
+            model=TEXT_TO_IMAGE_IDENTIFICATION_MODEL,
+            messages=[
+                {
+                    "role": "user",
+                    "content": [
+                        {"type": "text", "text": IMAGE_IDENTIFICATION_PROMPT},
+                        {"type": "image_url", "image_url": {"url": f"data:image/png;base64,{img_b64}"}}
+                    ]
+                }
+            ]
+        )
+        usage.update(completion_usage(response))
+    _record_latency("image", TEXT_TO_IMAGE_IDENTIFICATION_MODEL, started)
+    cleaned_list = re.split(r'\n-?\s*', response.choices[0].message.content.strip())  # handles both "\n" and "\n- " styles
+    return getCleanNames([item for item in cleaned_list if item]), TEXT_TO_IMAGE_IDENTIFICATION_MODEL
+
+
+async def identify_image_clients(client, img_bytes: bytes) -> Tuple[List[str], str]:
+    """
+    Identify clients in one image and return (names, model that produced them).
+    In tiered mode the fast vision model answers first and the strong model is only
+    used for large images, when the fast call fails, or when its answer is not
+    confident or cannot be parsed.
+    """
+    with _stats_lock:
+        _calls["image"] += 1
+    img_b64 = base64.b64encode(img_bytes).decode()
+    if not TIERED_ROUTING_ENABLED:
+        return await _run_strong_image(client, img_b64)
+
+    if len(img_bytes) > IMAGE_COMPLEXITY_BYTES:
+        _record_escalation("image", "complexity")
+        return await _run_strong_image(client, img_b64)
+
+    started = time.perf_counter()
+    try:
+        with model_call(IMAGE_FAST_MODEL, len(img_b64)) as usage:
+            response = await client.chat.completions.create(
+                model=IMAGE_FAST_MODEL,
+                response_format={"type": "json_object"},
+                messages=[
+                    {
+                        "role": "user",
+                        "content": [
+                            {"type": "text", "text": FAST_IMAGE_IDENTIFICATION_PROMPT},
+                            {"type": "image_url", "image_url": {"url": f"data:image/png;base64,{img_b64}"}}
+                        ]
+                    }
+                ]
+            )
+            usage.update(completion_usage(response))
+    except Exception as e:
+        logging.warning(f"Fast image model failed: {str(e)}")
+        _record_escalation("image", "error")
+        return await _run_strong_image(client, img_b64)
+    _record_latency("image", IMAGE_FAST_MODEL, started)
+
+    try:
+        answer = json.loads(response.choices[0].message.content)
+        names = sorted({name.strip() for name in answer["names"] if isinstance(name, str) and name.strip()})
+        confidence = float(answer["confidence"])
+    except (ValueError, KeyError, TypeError):
+        _record_escalation("image", "unparseable")
+        return await _run_strong_image(client, img_b64)
+
+    if confidence < IMAGE_ESCALATION_CONFIDENCE:
+        _record_escalation("image", "low_confidence")
+        return await _run_strong_image(client, img_b64)
+    return names, IMAGE_FAST_MODEL
+
+
+def routing_stats() -> dict:
+    """Return escalation rate and per-tier latency for each stage."""
+    with _stats_lock:
+        calls = dict(_calls)
+        escalations = {stage: dict(reasons) for stage, reasons in _escalations.items()}
+        latencies = {key: list(values) for key, values in _tier_latencies.items()}
+
+    stats = {}
+    for stage, count in calls.items():
+        escalated = sum(escalations.get(stage, {}).values())
+        stats[stage] = {
+            "calls": count,
+            "escalations": escalated,
+            "escalation_rate": escalated / count if count else 0.0,
+            "escalation_reasons": escalations.get(stage, {}),
+            "tiers": {
+                tier: {
+                    "calls": len(values),
+                    "latency_p50_ms": percentile(values, 50) * 1000,
+                    "latency_p95_ms": percentile(values, 95) * 1000,
+                }
+                for (tier_stage, tier), values in latencies.items() if tier_stage == stage
+            },
+        }
+    return stats
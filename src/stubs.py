@@ -0,0 +1,149 @@
+"""
+In-process stand-ins for the model and mail backends.
+
+They let the workflow run end to end without OpenAI or SMTP access, with a
+configurable latency per call, so the load generator and the job service can
+be exercised locally. Document text is still extracted by the real parsers.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import random
+import re
+import tempfile
+import time
+from contextlib import contextmanager
+from types import SimpleNamespace
+
+from src.models import ClientIdentificationResult, ClientInfo, TieredClientIdentificationResult
+from src.utils import get_registry_aliases
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+
+class StubBackendError(RuntimeError):
+    """Raised by a stand-in backend to simulate a failed call."""
+
+
+class StubBackends:
+    """
+    Model and SMTP stand-ins. Latencies are mean seconds per call; each call is
+    jittered by +/-50%. `error_rate` is the probability that a model call fails,
+    `smtp_error_rate` the probability that an email send fails, and `confidence`
+    is what fast-tier answers report (see src/routing.py).
+    """
+
+    def __init__(self, model_latency: float = 0.5, vision_latency: float = 1.0, smtp_latency: float = 0.2,
+                 error_rate: float = 0.0, smtp_error_rate: float = 0.0, confidence: float = 0.9, seed: int = None):
+        self.model_latency = model_latency
+        self.vision_latency = vision_latency
+        self.smtp_latency = smtp_latency
+        self.error_rate = error_rate
+        self.smtp_error_rate = smtp_error_rate
+        self.confidence = confidence
+        self.random = random.Random(seed)
+        self.aliases = get_registry_aliases()
+        self.calls = {"model": 0, "vision": 0, "smtp": 0, "errors": 0}
+
+    def _delay(self, mean: float) -> float:
+        return mean * self.random.uniform(0.5, 1.5)
+
+    async def _model_call(self, kind: str, mean: float):
+        self.calls[kind] += 1
+        await asyncio.sleep(self._delay(mean))
+        if self.random.random() < self.error_rate:
+            self.calls["errors"] += 1
+            raise StubBackendError(f"Injected {kind} failure")
+
+    def _find_clients(self, text: str):
+        return [alias for alias in self.aliases
+                if re.search(rf"(?<!\w){re.escape(alias)}(?!\w)", text, re.IGNORECASE)]
+
+    async def run_agent(self, agent, agent_input, run_config=None):
+        """Stand-in for agents.Runner.run."""
+        from src.agents import doc_processing_agent
+        from src.tools import read_document
+
+        await self._model_call("model", self.model_latency)
+        if agent is doc_processing_agent:
+            document_path = agent_input[0]["content"]
+            output = await asyncio.to_thread(read_document, document_path)
+        elif agent.output_type is TieredClientIdentificationResult:
+            output = TieredClientIdentificationResult(
+                clients=[ClientInfo(name=name) for name in self._find_clients(agent_input)],
+                confidence=self.confidence,
+            )
+        else:
+            output = ClientIdentificationResult(
+                clients=[ClientInfo(name=name) for name in self._find_clients(agent_input)]
+            )
+        return SimpleNamespace(final_output=output)
+
+    async def create_chat_completion(self, model, messages, **kwargs):
+        """Stand-in for client.chat.completions.create on image prompts."""
+        await self._model_call("vision", self.vision_latency)
+
+        # Pick a stable pseudo-random subset of registry clients per image
+        image_url = next(part["image_url"]["url"] for part in messages[-1]["content"] if part["type"] == "image_url")
+        digest = int(hashlib.sha256(image_url.encode()).hexdigest(), 16)
+        names = [alias for i, alias in enumerate(self.aliases) if digest >> i & 1]
+        if kwargs.get("response_format", {}).get("type") == "json_object":
+            content = json.dumps({"names": names, "confidence": self.confidence})
+        else:
+            content = repr(names)
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+    def send_email(self, recipient_email, subject, body, doc_temp_path, file_name, email_from_alias=None) -> str:
+        """Stand-in for send_email_with_doc_attached. Blocks like smtplib does."""
+        self.calls["smtp"] += 1
+        time.sleep(self._delay(self.smtp_latency))
+        if self.random.random() < self.smtp_error_rate:
+            self.calls["errors"] += 1
+            # Same shape as send_email_with_doc_attached, which reports SMTP errors instead of raising
+            return "Error sending email: Injected SMTP failure"
+        return "Email sent successfully!"
+
+    def openai_client(self):
+        return SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=self.create_chat_completion)))
+
+
+@contextmanager
+def stub_backends(revisions: bool = False, **kwargs):
+    """
+    Route the workflow nodes' model and mail calls to StubBackends for the duration of the block.
+
+    Stand-in results must never be reused by real runs, so checkpoints go to a scratch
+    directory that is deleted afterwards. Revision reuse is disabled, so every job
+    exercises the (stub) models; with `revisions=True` it uses a scratch store as well.
+    """
+    import src.checkpoint as checkpoint
+    import src.nodes as nodes
+    import src.revisions as revisions_module
+    import src.routing as routing
+
+    backends = StubBackends(**kwargs)
+    runner = SimpleNamespace(run=backends.run_agent)
+    scratch_dir = tempfile.TemporaryDirectory(prefix="stub-backends-")
+    patches = [
+        (nodes, "Runner", runner),
+        (routing, "Runner", runner),
+        (nodes, "get_openai_client", backends.openai_client),
+        (nodes, "send_email_with_doc_attached", backends.send_email),
+        (nodes, "REVISION_ENABLED", revisions),
+        (revisions_module, "REVISION_DB_PATH", os.path.join(scratch_dir.name, "revisions.sqlite")),
+        (checkpoint, "CHECKPOINT_DB_PATH", os.path.join(scratch_dir.name, "workflow.sqlite")),
+        (checkpoint, "CHECKPOINT_BLOB_DIR", os.path.join(scratch_dir.name, "blobs")),
+    ]
+    originals = [(module, name, getattr(module, name)) for module, name, _ in patches]
+    for module, name, value in patches:
+        setattr(module, name, value)
+    logging.info("Workflow nodes are using stub model and mail backends")
+    try:
+        yield backends
+    finally:
+        for module, name, value in originals:
+            setattr(module, name, value)
+        scratch_dir.cleanup()
@@ -13,9 +13,8 @@ load_dotenv()
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
-@function_tool
-def extract_document_content(doc_path: str) -> str:
-    """Reads the content of a DOC, DOCX, or PDF file."""
+def read_document(doc_path: str) -> str:
+    """Reads the content of a DOCX or PDF file."""
     # Ensure the file exists
     if not os.path.isfile(doc_path):
         return f"Error: The file '{doc_path}' does not exist."
@@ -29,4 +28,8 @@ def extract_document_content(doc_path: str) -> str:
         return process_pdf(doc_path)
     else:
         return "Error: Unsupported file format. Please upload a DOCX or PDF file."
-    
\ No newline at end of file
+
+@function_tool
+def extract_document_content(doc_path: str) -> str:
+    """Reads the content of a DOC, DOCX, or PDF file."""
+    return read_document(doc_path)
@@ -0,0 +1,132 @@
+import asyncio
+import importlib.util
+import logging
+import threading
+import time
+import weakref
+from collections import deque
+
+from config import (
+    OPENAI_BASE_URL,
+    OPENAI_API_KEY,
+    HTTP_MAX_CONNECTIONS,
+    HTTP_MAX_KEEPALIVE_CONNECTIONS,
+    HTTP_KEEPALIVE_EXPIRY,
+    HTTP_TIMEOUT,
+    HTTP_CONNECT_TIMEOUT,
+    HTTP_ENABLE_HTTP2,
+    OPENAI_MAX_RETRIES,
+)
+from src.utils import percentile
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+# Pooled connections belong to the event loop that opened them, so there is one
+# transport per running loop. A long-lived loop (service, batch worker) shares a
+# single pool across every document it processes.
+_transports = weakref.WeakKeyDictionary()
+
+_stats_lock = threading.Lock()
+_stats = {
+    "requests": 0,
+    "errors": 0,
+    "connections_opened": 0,
+    "tls_handshakes": 0,
+    "http2_responses": 0,
+}
+_latencies = deque(maxlen=1000)
+
+
+def _http2_available() -> bool:
+    return HTTP_ENABLE_HTTP2 and importlib.util.find_spec("h2") is not None
+
+
+def _increment(key: str, amount: int = 1):
+    with _stats_lock:
+        _stats[key] += amount
+
+
+async def _trace(event_name: str, info: dict):
+    """httpcore trace hook: counts new connections so reuse can be derived."""
+    if event_name == "connection.connect_tcp.complete":
+        _increment("connections_opened")
+    elif event_name == "connection.start_tls.complete":
+        _increment("tls_handshakes")
+
+
+async def _on_request(request):
+    request.extensions["trace"] = _trace
+    request.extensions["transport_started"] = time.perf_counter()
+
+
+async def _on_response(response):
+    started = response.request.extensions.get("transport_started")
+    with _stats_lock:
+        _stats["requests"] += 1
+        if response.status_code >= 400:
+            _stats["errors"] += 1
+        if response.http_version == "HTTP/2":
+            _stats["http2_responses"] += 1
+        if started is not None:
+            _latencies.append(time.perf_counter() - started)
+
+
+def _create_transport():
+    import httpx
+    from openai import AsyncOpenAI
+
+    http2 = _http2_available()
+    http_client = httpx.AsyncClient(
+        http2=http2,
+        limits=httpx.Limits(
+            max_connections=HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+        ),
+        timeout=httpx.Timeout(HTTP_TIMEOUT, connect=HTTP_CONNECT_TIMEOUT),
+        event_hooks={"request": [_on_request], "response": [_on_response]},
+    )
+    openai_client = AsyncOpenAI(
+        base_url=OPENAI_BASE_URL,
+        api_key=OPENAI_API_KEY,
+        http_client=http_client,
+        max_retries=OPENAI_MAX_RETRIES,
+    )
+    logging.info(
+        f"HTTP transport created (http2={http2}, max_connections={HTTP_MAX_CONNECTIONS}, "
+        f"keepalive={HTTP_MAX_KEEPALIVE_CONNECTIONS}/{HTTP_KEEPALIVE_EXPIRY}s)"
+    )
+    return http_client, openai_client
+
+
+def get_openai_client():
+    """Return the AsyncOpenAI client bound to the shared transport of the running event loop."""
+    loop = asyncio.get_running_loop()
+    transport = _transports.get(loop)
+    if transport is None:
+        transport = _create_transport()
+        _transports[loop] = transport
+    return transport[1]
+
+
+async def close_transport():
+    """Close the transport of the running event loop, if one was created."""
+    transport = _transports.pop(asyncio.get_running_loop(), None)
+    if transport is not None:
+        await transport[0].aclose()
+
+
+def transport_stats() -> dict:
+    """Return connection reuse and request latency statistics for all transports."""
+    with _stats_lock:
+        stats = dict(_stats)
+        latencies = list(_latencies)
+
+    stats["connections_reused"] = max(0, stats["requests"] - stats["connections_opened"])
+    stats["reuse_ratio"] = stats["connections_reused"] / stats["requests"] if stats["requests"] else 0.0
+    stats["latency_p50_ms"] = percentile(latencies, 50) * 1000
+    stats["latency_p95_ms"] = percentile(latencies, 95) * 1000
+    stats["latency_max_ms"] = max(latencies, default=0.0) * 1000
+    stats["open_transports"] = len(_transports)
+    return stats
@@ -41,6 +41,26 @@ def get_assistants_for_client(client_name: str) -> List[Dict[str, str]]:
         return []
     
 
+def get_registry_aliases() -> List[str]:
+    """
+    Return every known client name and alias: VALID_CLIENTS plus the names and
+    optional "aliases" listed for each client in data.json.
+    """
+    aliases = set(VALID_CLIENTS)
+    try:
+        data_file = os.path.join(os.path.dirname(__file__), "..", "data.json")
+        with open(data_file, "r") as file:
+            data = json.load(file)
+
+        for client in data.get("clients", []):
+            if client.get("name"):
+                aliases.add(client["name"])
+            aliases.update(client.get("aliases", []))
+    except Exception as e:
+        logging.error(f"Error reading client aliases: {str(e)}", exc_info=True)
+
+    return sorted(aliases)
+
 def getCleanNames(extracted_names: str) -> List[str]:
     """
     Retrieve a list of clean names from the data.json file.
@@ -66,6 +86,14 @@ def getCleanNames(extracted_names: str) -> List[str]:
     cleaned_names = sorted(set(all_names))
     return cleaned_names
 
+def percentile(values: List[float], percent: float) -> float:
+    """Return the nearest-rank percentile of a list of numbers (0.0 when empty)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(percent / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
 def save_info_in_file(info, infoType, filename="log.txt"):
     """Save the information to a text file."""
     try:
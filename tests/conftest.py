@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Make the project root importable (config.py and the src package)
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
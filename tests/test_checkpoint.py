@@ -0,0 +1,126 @@
+import asyncio
+import json
+import os
+
+import pytest
+
+import src.nodes as nodes
+from src import metrics
+from src.checkpoint import CheckpointStore
+from src.graph import create_workflow_graph
+from src.models import State
+from src.stubs import StubBackends, stub_backends
+
+DOCS_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "DummyDocs"))
+DOCUMENT = os.path.join(DOCS_DIR, "input.docx")
+# Has images, so client_consolidator joins the text and image branches
+IMAGE_DOCUMENT = os.path.join(DOCS_DIR, "Digital_Marketing_Trends_2025_Enhanced.docx")
+STUB_LATENCIES = {"model_latency": 0, "vision_latency": 0, "smtp_latency": 0}
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    # Logs and metrics are written relative to the working directory
+    monkeypatch.chdir(tmp_path)
+    # Keep revision reuse out of the way so only checkpoints can skip work
+    monkeypatch.setattr(nodes, "REVISION_ENABLED", False)
+    return CheckpointStore(str(tmp_path / "checkpoints.sqlite"), str(tmp_path / "blobs"))
+
+
+def run(store, run_id, document=DOCUMENT):
+    workflow = create_workflow_graph(document, os.path.basename(document), run_id=run_id, checkpoint_store=store)
+    return asyncio.run(workflow.compile().ainvoke(State(email_from_alias="Test")))
+
+
+def test_failed_email_keeps_checkpoints_and_resume_skips_model_calls(store):
+    with stub_backends(smtp_error_rate=1.0, **STUB_LATENCIES) as backends:
+        final_state = run(store, "r1")
+
+    assert backends.calls["smtp"] > 0
+    assert not final_state["email_sent"]
+    assert final_state["failed_recipients"]
+    completed = set(store.completed_nodes("r1"))
+    assert {"document_processor", "client_identifier", "extract_images", "extract_clients"} <= completed
+
+    with stub_backends(**STUB_LATENCIES) as backends:
+        final_state = run(store, "r1")
+
+    assert backends.calls["model"] == 0
+    assert backends.calls["vision"] == 0
+    assert final_state["email_sent"]
+    assert not final_state["failed_recipients"]
+    assert store.completed_nodes("r1") == []
+
+
+def test_partial_email_failure_retries_only_failed_recipients(store, monkeypatch):
+    send_email = StubBackends.send_email
+    failing, attempted, delivered = set(), [], []
+
+    def flaky_send(self, recipient_email, subject, body, *args, **kwargs):
+        # The first message fails until the retry
+        message = (recipient_email, subject, body)
+        if not attempted:
+            failing.add(message)
+        attempted.append(message)
+        if message in failing:
+            return "Error sending email: Injected SMTP failure"
+        delivered.append(message)
+        return send_email(self, recipient_email, subject, body, *args, **kwargs)
+
+    monkeypatch.setattr(StubBackends, "send_email", flaky_send)
+    with stub_backends(**STUB_LATENCIES):
+        final_state = run(store, "r5", IMAGE_DOCUMENT)
+
+    assert final_state["failed_recipients"] == [recipient_email for recipient_email, _, _ in failing]
+    assert delivered
+
+    failing.clear()
+    with stub_backends(**STUB_LATENCIES):
+        final_state = run(store, "r5", IMAGE_DOCUMENT)
+
+    assert not final_state["failed_recipients"]
+    assert len(delivered) == len(set(delivered))
+    assert set(delivered) == set(attempted)
+    assert store.completed_nodes("r5") == []
+
+
+def test_checkpointed_run_joins_text_and_image_clients(store):
+    with stub_backends(**STUB_LATENCIES) as backends:
+        unchecked_state = run(store, None, IMAGE_DOCUMENT)
+    unchecked_emails = backends.calls["smtp"]
+
+    with stub_backends(**STUB_LATENCIES) as backends:
+        final_state = run(store, "r4", IMAGE_DOCUMENT)
+
+    assert final_state["clients_from_images"]
+    assert set(final_state["clients_from_images"]) <= set(final_state["consolidated_clients"])
+    assert sorted(final_state["consolidated_clients"]) == sorted(unchecked_state["consolidated_clients"])
+    assert unchecked_emails > 0
+    assert backends.calls["smtp"] == unchecked_emails
+
+
+def test_successful_run_clears_checkpoints(store):
+    with stub_backends(**STUB_LATENCIES):
+        final_state = run(store, "r2")
+
+    assert final_state["email_sent"]
+    assert store.completed_nodes("r2") == []
+
+
+def test_resumed_nodes_are_recorded_as_cached(store, tmp_path):
+    metrics.flush_events(str(tmp_path / "earlier.jsonl"))
+    with stub_backends(smtp_error_rate=1.0, **STUB_LATENCIES):
+        run(store, "r3")
+    completed = set(store.completed_nodes("r3"))
+    metrics.flush_events(str(tmp_path / "first.jsonl"))
+
+    with stub_backends(**STUB_LATENCIES):
+        run(store, "r3")
+    events_path = tmp_path / "resume.jsonl"
+    metrics.flush_events(str(events_path))
+
+    with open(events_path) as file:
+        node_events = [event for event in map(json.loads, file) if event["type"] == "node"]
+    # email_sender only saved its progress, so it runs again
+    assert {event["node"] for event in node_events if event["cached"]} == completed - {"email_sender"}
+    assert [event["node"] for event in node_events if not event["cached"]] == ["email_sender"]
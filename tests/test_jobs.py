@@ -0,0 +1,55 @@
+import asyncio
+import os
+
+import pytest
+
+from src.jobs import JobManager, SUCCEEDED
+from src.stubs import stub_backends
+
+DOCUMENT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "DummyDocs", "input.docx"))
+
+
+@pytest.fixture(autouse=True)
+def workdir(tmp_path, monkeypatch):
+    # Checkpoints, logs and metrics are written relative to the working directory
+    monkeypatch.chdir(tmp_path)
+
+
+def run_submissions(file_bytes, count, **stub_options):
+    async def scenario():
+        manager = JobManager(workers=2, queue_size=8, upload_dir="uploads")
+        await manager.start()
+        submissions = [manager.submit("input.docx", file_bytes, "Test") for _ in range(count)]
+        await manager.queue.join()
+        await manager.stop()
+        return submissions
+
+    with stub_backends(model_latency=0, vision_latency=0, smtp_latency=0, **stub_options) as backends:
+        submissions = asyncio.run(scenario())
+    return submissions, backends.calls["smtp"]
+
+
+def test_duplicate_submission_returns_unfinished_job():
+    with open(DOCUMENT, "rb") as f:
+        file_bytes = f.read()
+
+    _, single_run_emails = run_submissions(file_bytes, 1)
+    submissions, emails = run_submissions(file_bytes, 3)
+
+    assert len({job["job_id"] for job, _ in submissions}) == 1
+    assert [created for _, created in submissions] == [True, False, False]
+    assert submissions[0][0]["status"] == SUCCEEDED
+    assert single_run_emails > 0
+    assert emails == single_run_emails
+
+
+def test_failed_sends_are_reported_in_the_result():
+    with open(DOCUMENT, "rb") as f:
+        file_bytes = f.read()
+
+    submissions, emails = run_submissions(file_bytes, 1, smtp_error_rate=1.0)
+
+    result = submissions[0][0]["result"]
+    assert emails > 0
+    assert not result["email_sent"]
+    assert len(result["failed_recipients"]) == emails
@@ -0,0 +1,48 @@
+import asyncio
+import os
+
+import pytest
+
+import src.routing as routing
+from src.graph import create_workflow_graph
+from src.models import State
+from src.revisions import RevisionStore
+from src.stubs import stub_backends
+
+DOCUMENT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "DummyDocs", "input.docx"))
+
+
+@pytest.fixture(autouse=True)
+def workdir(tmp_path, monkeypatch):
+    # Logs and metrics are written relative to the working directory
+    monkeypatch.chdir(tmp_path)
+
+
+def run():
+    workflow = create_workflow_graph(DOCUMENT, "input.docx")
+    return asyncio.run(workflow.compile().ainvoke(State(email_from_alias="Test")))
+
+
+def test_paragraph_results_are_keyed_by_model(tmp_path):
+    store = RevisionStore(str(tmp_path / "revisions.sqlite"))
+    store.record_document("doc", "report.docx", [("p1", "model-a", ["IBM"]), ("p2", "model-b", ["Neste"])])
+
+    assert store.paragraph_clients("doc", ["model-a"]) == {"p1": ("model-a", ["IBM"])}
+    assert store.paragraph_clients("doc", ["model-c"]) == {}
+
+
+def test_changing_the_model_reanalyses_unchanged_paragraphs(monkeypatch):
+    with stub_backends(revisions=True, model_latency=0, vision_latency=0, smtp_latency=0) as backends:
+        first = run()
+        calls = backends.calls["model"]
+        run()
+        reused_calls = backends.calls["model"] - calls
+
+        monkeypatch.setattr(routing, "CLIENT_IDENTIFICATION_MODEL", "another-model")
+        calls = backends.calls["model"]
+        final_state = run()
+        new_model_calls = backends.calls["model"] - calls
+
+    assert reused_calls == 0
+    assert new_model_calls == 1
+    assert final_state["clients_identified"] == first["clients_identified"]
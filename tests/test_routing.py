@@ -0,0 +1,41 @@
+import asyncio
+
+import src.routing as routing
+from config import IMAGE_FAST_MODEL, TEXT_TO_IMAGE_IDENTIFICATION_MODEL
+from src.agents import fast_clients_identification_agent
+from src.stubs import StubBackends, stub_backends
+
+
+def test_fast_tier_errors_escalate_to_strong_model(monkeypatch):
+    monkeypatch.setattr(routing, "TIERED_ROUTING_ENABLED", True)
+    run_agent, create_chat_completion = StubBackends.run_agent, StubBackends.create_chat_completion
+
+    async def failing_fast_agent(self, agent, agent_input, run_config=None):
+        if agent is fast_clients_identification_agent:
+            raise TimeoutError("fast text model timed out")
+        return await run_agent(self, agent, agent_input, run_config)
+
+    async def failing_fast_vision(self, model, messages, **kwargs):
+        if model == IMAGE_FAST_MODEL:
+            raise TimeoutError("fast vision model timed out")
+        return await create_chat_completion(self, model, messages, **kwargs)
+
+    monkeypatch.setattr(StubBackends, "run_agent", failing_fast_agent)
+    monkeypatch.setattr(StubBackends, "create_chat_completion", failing_fast_vision)
+    def error_escalations():
+        stats = routing.routing_stats()
+        return {stage: stats.get(stage, {}).get("escalation_reasons", {}).get("error", 0) for stage in ("text", "image")}
+
+    errors_before = error_escalations()
+
+    async def scenario(client):
+        text_clients, _ = await routing.identify_text_clients(client, "Our work with IBM this year.", 10)
+        image_result = await routing.identify_image_clients(client, b"image bytes")
+        return text_clients, image_result
+
+    with stub_backends(model_latency=0, vision_latency=0, smtp_latency=0) as backends:
+        text_clients, (_, image_model) = asyncio.run(scenario(backends.openai_client()))
+
+    assert "IBM" in text_clients
+    assert image_model == TEXT_TO_IMAGE_IDENTIFICATION_MODEL
+    assert error_escalations() == {stage: count + 1 for stage, count in errors_before.items()}
@@ -0,0 +1,25 @@
+import asyncio
+
+from aiohttp.test_utils import TestClient, TestServer
+
+from service import create_app
+
+
+def post_jobs(**kwargs):
+    async def scenario():
+        async with TestClient(TestServer(create_app(workers=1, queue_size=1))) as client:
+            response = await client.post("/jobs", **kwargs)
+            return response.status, await response.json()
+
+    return asyncio.run(scenario())
+
+
+def test_non_multipart_upload_is_rejected():
+    status, body = post_jobs(json={"file": "input.docx"})
+    assert status == 400
+    assert "multipart" in body["error"]
+
+
+def test_multipart_without_boundary_is_rejected():
+    status, _ = post_jobs(data=b"--x--", headers={"Content-Type": "multipart/form-data"})
+    assert status == 400